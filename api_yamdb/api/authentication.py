@@ -0,0 +1,192 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import datetime_to_epoch
+
+from api.cache import get_shared_cache
+from reviews import constants
+from reviews.models import User
+
+USER_KEY = 'api:user:{}'
+REVOKED_KEY = 'api:revoked:{}'
+ROLE_CLAIMS = ('role', 'is_superuser')
+ISSUED_AT_CLAIM = 'iat'
+
+
+class TokenCache:
+    """Ограниченный LRU-кеш проверенных токенов внутри процесса.
+
+    Ключ — SHA-256 от закодированного токена, поэтому сам токен в памяти
+    как ключ не хранится. Запись перестаёт выдаваться с наступлением
+    `exp` токена.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.tokens = OrderedDict()
+        self.hits = self.misses = 0
+
+    @staticmethod
+    def make_key(raw_token):
+        if isinstance(raw_token, str):
+            raw_token = raw_token.encode()
+        return hashlib.sha256(raw_token).digest()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.tokens.get(key)
+            if entry is not None and entry[0] > time.time():
+                self.tokens.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self.tokens[key]
+            self.misses += 1
+        return None
+
+    def set(self, key, token):
+        expires_at = token.get('exp')
+        if expires_at is None:
+            return
+        with self.lock:
+            self.tokens[key] = (expires_at, token)
+            self.tokens.move_to_end(key)
+            while len(self.tokens) > self.maxsize:
+                self.tokens.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.tokens.clear()
+            self.hits = self.misses = 0
+
+    def get_stats(self):
+        with self.lock:
+            requests = self.hits + self.misses
+            return {
+                'size': len(self.tokens),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / requests if requests else 0.0,
+            }
+
+
+token_cache = TokenCache(constants.TOKEN_CACHE_SIZE)
+
+
+def forget_user(user_id):
+    get_shared_cache().delete(USER_KEY.format(user_id))
+
+
+def revoke_claims(user_id):
+    """Перестаёт доверять ролям в токенах, выданных пользователю раньше.
+
+    Отметка живёт столько же, сколько access-токен: более старые токены
+    к этому времени уже истекут.
+    """
+    get_shared_cache().set(
+        REVOKED_KEY.format(user_id),
+        int(time.time()),
+        api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()
+    )
+
+
+def get_tokens_for_user(user):
+    """Refresh-токен с ролью пользователя; access-токен наследует её."""
+    refresh = RefreshToken.for_user(user)
+    refresh['role'] = user.role
+    refresh['is_superuser'] = user.is_superuser
+    refresh[ISSUED_AT_CLAIM] = datetime_to_epoch(refresh.current_time)
+    return refresh
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication, который берёт токен и пользователя из кеша.
+
+    Проверенный токен хранится в памяти процесса до своего `exp`, так что
+    подпись повторно используемого токена проверяется один раз.
+    Пользователь хранится в кеше SHARED_CACHE_ALIAS, общем для всех
+    процессов; запись сбрасывается сигналами после любого сохранения
+    или удаления пользователя, поэтому смена роли или блокировка
+    действуют со следующего запроса в любом процессе. Изменения через
+    QuerySet.update() сигналы не вызывают — запись устареет не больше
+    чем на `user_cache_timeout`.
+    """
+
+    user_cache_timeout = 60 * 5
+    token_cache = token_cache
+
+    def get_validated_token(self, raw_token):
+        key = self.token_cache.make_key(raw_token)
+        token = self.token_cache.get(key)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            self.token_cache.set(key, token)
+        return token
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+        key = USER_KEY.format(user_id)
+        shared_cache = get_shared_cache()
+        user = shared_cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            shared_cache.set(key, user, self.user_cache_timeout)
+        return user
+
+
+class RoleTokenUser(TokenUser):
+    """Пользователь, восстановленный из ролевых утверждений токена."""
+
+    @cached_property
+    def role(self):
+        return self.token['role']
+
+    @property
+    def is_admin(self):
+        return self.role == User.ADMIN or self.is_superuser
+
+    @property
+    def is_moderator(self):
+        return self.role == User.MODERATOR
+
+
+class StatelessJWTAuthentication(CachedJWTAuthentication):
+    """Проверка прав по ролям из токена, без обращения к таблице users.
+
+    Если пользователю сменили роль, заблокировали или удалили его, то
+    отметка об отзыве заставляет загружать пользователя заново для всех
+    токенов, выданных раньше. Токены без ролевых утверждений
+    обрабатываются как в CachedJWTAuthentication.
+
+    Режим включается явно в DEFAULT_AUTHENTICATION_CLASSES. Отметки
+    хранятся в кеше SHARED_CACHE_ALIAS, который должен быть общим для
+    всех процессов, не вытеснять записи раньше срока и не обращаться к
+    базе данных; проверка api.E001 не даёт запустить проект с кешем в
+    памяти процесса или в базе данных.
+    """
+
+    def get_user(self, validated_token):
+        if self.has_fresh_claims(validated_token):
+            return RoleTokenUser(validated_token)
+        return super().get_user(validated_token)
+
+    @staticmethod
+    def has_fresh_claims(token):
+        user_id = token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None or not all(
+            claim in token for claim in ROLE_CLAIMS + (ISSUED_AT_CLAIM,)
+        ):
+            return False
+        revoked_at = get_shared_cache().get(REVOKED_KEY.format(user_id))
+        return revoked_at is None or token[ISSUED_AT_CLAIM] > revoked_at
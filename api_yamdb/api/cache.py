@@ -0,0 +1,69 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+VERSION_KEY = 'api:version:{}'
+# Версия данных одного произведения: поля, жанры и рейтинг.
+TITLE_SCOPE = 'title:{}'
+# Версии отзывов произведения и комментариев к отзыву.
+REVIEWS_SCOPE = 'reviews:title:{}'
+COMMENTS_SCOPE = 'comments:review:{}'
+
+
+def get_shared_cache():
+    """Кеш, общий для всех процессов и не вытесняющий записи."""
+    return caches[settings.SHARED_CACHE_ALIAS]
+
+
+def get_versions(*scopes):
+    """Возвращает версии данных для перечисленных областей.
+
+    Версия — момент последнего изменения в наносекундах. Версии хранятся
+    в общем кеше, чтобы запись в одном процессе сбрасывала ETag и
+    закешированные ответы во всех. Если версия вытеснена из кеша, она
+    создаётся заново и тем самым сбрасывает все зависящие от неё записи.
+    """
+    shared_cache = get_shared_cache()
+    keys = {scope: VERSION_KEY.format(scope) for scope in scopes}
+    stored = shared_cache.get_many(keys.values())
+    versions = {}
+    for scope, key in keys.items():
+        if key not in stored:
+            shared_cache.add(key, time.time_ns(), None)
+            stored[key] = shared_cache.get(key, time.time_ns())
+        versions[scope] = stored[key]
+    return versions
+
+
+def bump_versions(*scopes):
+    shared_cache = get_shared_cache()
+    now = time.time_ns()
+    keys = [VERSION_KEY.format(scope) for scope in scopes]
+    stored = shared_cache.get_many(keys)
+    shared_cache.set_many(
+        {key: max(now, stored.get(key, 0) + 1) for key in keys}, None
+    )
+
+
+def get_digest(request, versions, ignored_params=(), extra=None):
+    """Хеш адреса, нормализованных параметров запроса и версий данных."""
+    params = sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        if name not in ignored_params
+        for value in values
+    )
+    return hashlib.md5(repr((
+        request.build_absolute_uri(request.path),
+        params,
+        sorted(versions.items()),
+        extra
+    )).encode()).hexdigest()
+
+
+def make_key(prefix, request, scopes, ignored_params=()):
+    """Ключ кеша для запроса с учётом нормализованных параметров."""
+    digest = get_digest(request, get_versions(*scopes), ignored_params)
+    return f'api:{prefix}:{digest}'
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.db import DatabaseCache
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, Warning, register
+from rest_framework.settings import api_settings
+
+from api.authentication import StatelessJWTAuthentication
+
+# Кеши, которые не видны другим процессам или не хранят записи.
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+# Кеши, каждое обращение к которым — запрос к базе данных.
+DATABASE_CACHES = (DatabaseCache,)
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """Общий кеш должен быть виден всем процессам и не нагружать базу."""
+    shared_cache = caches[settings.SHARED_CACHE_ALIAS]
+    if isinstance(shared_cache, PROCESS_LOCAL_CACHES):
+        problem = 'хранится в памяти процесса и не виден другим процессам'
+    elif isinstance(shared_cache, DATABASE_CACHES):
+        problem = 'хранится в базе данных и добавляет запросы к ней'
+    else:
+        return []
+    return [Warning(
+        f'Кеш "{settings.SHARED_CACHE_ALIAS}" {problem}.',
+        hint='Укажите адрес memcached в переменной окружения '
+             'SHARED_CACHE_LOCATION.',
+        obj='CACHES',
+        id='api.W001',
+    )]
+
+
+@register(Tags.security)
+def check_stateless_authentication(app_configs, **kwargs):
+    """Отметки об отзыве ролей должны быть видны всем процессам.
+
+    Кеш в базе данных тоже не подходит: проверка отметки на каждом
+    запросе стала бы запросом к базе, который этот режим убирает.
+    """
+    if not any(
+        issubclass(authentication, StatelessJWTAuthentication)
+        for authentication in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    ):
+        return []
+    shared_cache = caches[settings.SHARED_CACHE_ALIAS]
+    if isinstance(shared_cache, PROCESS_LOCAL_CACHES):
+        problem = 'хранится в памяти процесса'
+    elif isinstance(shared_cache, DATABASE_CACHES):
+        problem = 'хранится в базе данных'
+    else:
+        return []
+    return [Error(
+        'StatelessJWTAuthentication требует общего для всех процессов '
+        f'кеша вне базы данных, а кеш "{settings.SHARED_CACHE_ALIAS}" '
+        f'{problem}.',
+        hint='Укажите адрес memcached в переменной окружения '
+             'SHARED_CACHE_LOCATION или используйте '
+             'CachedJWTAuthentication.',
+        obj='REST_FRAMEWORK',
+        id='api.E001',
+    )]
@@ -0,0 +1,46 @@
+import json
+
+from rest_framework.utils.encoders import JSONEncoder
+
+from api.serializers import CommentChangeSerializer, ReviewSerializer
+from reviews import constants
+from reviews.models import Comment
+
+
+def to_line(kind, data):
+    return json.dumps(
+        {'type': kind, **data}, cls=JSONEncoder, ensure_ascii=False
+    ) + '\n'
+
+
+def export_reviews(title, include_comments=False, chunk_size=None):
+    """Отзывы (и комментарии) произведения в формате NDJSON.
+
+    Строки читаются из базы курсором через `.iterator()` и отдаются
+    пачками по `chunk_size`, поэтому расход памяти не зависит от
+    количества отзывов. Комментарии выгружаются после всех отзывов
+    отдельным запросом и ссылаются на отзыв полем `review`.
+    """
+    chunk_size = chunk_size or constants.EXPORT_CHUNK_SIZE
+    streams = [(
+        'review',
+        ReviewSerializer,
+        title.reviews.select_related('author').order_by('id')
+    )]
+    if include_comments:
+        streams.append((
+            'comment',
+            CommentChangeSerializer,
+            Comment.objects.filter(review__title=title)
+            .select_related('author')
+            .order_by('review_id', 'id')
+        ))
+    for kind, serializer_class, queryset in streams:
+        lines = []
+        for obj in queryset.iterator(chunk_size=chunk_size):
+            lines.append(to_line(kind, serializer_class(obj).data))
+            if len(lines) >= chunk_size:
+                yield ''.join(lines)
+                lines = []
+        if lines:
+            yield ''.join(lines)
@@ -1,13 +1,90 @@
+from django.db.models import Exists, OuterRef
 from django_filters import rest_framework as filters
+from rest_framework.filters import SearchFilter
 
-from reviews.models import Title
+from reviews.models import Category, Genre, Title
+from reviews.search import search_titles, trigram_candidates
+
+
+class TrigramSearchFilter(SearchFilter):
+    """SearchFilter, который отбирает кандидатов по индексу триграмм.
+
+    Используется, если модель объявляет `trigram_field` и поиск идёт
+    только по этому полю. Слова короче триграммы ищутся как обычно.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        field = getattr(queryset.model, 'trigram_field', None)
+        if not search_terms or tuple(search_fields or ()) != (field,):
+            return super().filter_queryset(request, queryset, view)
+        for term in search_terms:
+            candidates = trigram_candidates(queryset.model, term)
+            if candidates is not None:
+                queryset = queryset.filter(pk__in=candidates)
+            queryset = queryset.filter(**{f'{field}__icontains': term})
+        return queryset
+
+
+class CharInFilter(filters.BaseInFilter, filters.CharFilter):
+    pass
 
 
 class TitlesFilter(filters.FilterSet):
-    category = filters.CharFilter(field_name='category__slug')
-    genre = filters.CharFilter(field_name='genre__slug')
+    """Фильтры произведений.
+
+    `category` и `genre` принимают несколько slug через запятую.
+    Для жанров `genre_match=all` требует наличия всех жанров, по
+    умолчанию достаточно любого. Фильтры по связанным моделям
+    выполняются подзапросами IN/EXISTS и не размножают строки.
+    """
+
+    GENRE_MATCH_CHOICES = (
+        ('any', 'any'),
+        ('all', 'all'),
+    )
+
+    category = CharInFilter(method='filter_category')
+    genre = CharInFilter(method='filter_genre')
+    genre_match = filters.ChoiceFilter(
+        choices=GENRE_MATCH_CHOICES,
+        method='filter_genre_match'
+    )
     name = filters.CharFilter(field_name='name')
+    year_min = filters.NumberFilter(field_name='year', lookup_expr='gte')
+    year_max = filters.NumberFilter(field_name='year', lookup_expr='lte')
+    search = filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = 'category', 'genre', 'year', 'name'
+        fields = (
+            'category', 'genre', 'genre_match', 'year', 'year_min',
+            'year_max', 'name', 'search'
+        )
+
+    def filter_category(self, queryset, name, value):
+        return queryset.filter(
+            category__in=Category.objects.filter(slug__in=value)
+        )
+
+    def filter_genre(self, queryset, name, value):
+        title_genres = Title.genre.through.objects.filter(
+            title_id=OuterRef('pk')
+        )
+        if self.form.cleaned_data.get('genre_match') == 'all':
+            for slug in set(value):
+                queryset = queryset.filter(Exists(title_genres.filter(
+                    genre__in=Genre.objects.filter(slug=slug)
+                )))
+            return queryset
+        return queryset.filter(Exists(title_genres.filter(
+            genre__in=Genre.objects.filter(slug__in=value)
+        )))
+
+    def filter_genre_match(self, queryset, name, value):
+        # Учитывается в filter_genre.
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        return search_titles(queryset, value)
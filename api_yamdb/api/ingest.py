@@ -0,0 +1,115 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from rest_framework.settings import api_settings
+
+from api.cache import REVIEWS_SCOPE, TITLE_SCOPE, bump_versions
+from api.serializers import BulkReviewSerializer
+from reviews import constants
+from reviews.models import Review, Title, User
+from reviews.signals import update_score_count, update_title_rating
+
+
+class ReviewIngest:
+    """Пакетная загрузка отзывов к разным произведениям.
+
+    Отзывы проверяются и вставляются через `bulk_create` пачками по
+    `batch_size`: на пачку уходит по запросу на произведения, авторов
+    и существующие отзывы. `bulk_create` не вызывает сигналы, поэтому
+    рейтинги, распределения оценок и версии кеша обновляются здесь,
+    один раз на произведение в конце загрузки.
+    """
+
+    batch_size = constants.BULK_REVIEWS_BATCH_SIZE
+
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+        self.seen = set()
+        self.totals = defaultdict(lambda: [0, 0])
+        self.scores = Counter()
+
+    def run(self, items):
+        with transaction.atomic():
+            for start in range(0, len(items), self.batch_size):
+                self.ingest_batch(items[start:start + self.batch_size], start)
+            for title_id, (count, score_sum) in self.totals.items():
+                update_title_rating(title_id, count, score_sum)
+            for (title_id, score), count in self.scores.items():
+                update_score_count(title_id, score, count)
+            if self.created:
+                scopes = ['rating']
+                for title_id in self.totals:
+                    scopes += [TITLE_SCOPE.format(title_id),
+                               REVIEWS_SCOPE.format(title_id)]
+                transaction.on_commit(lambda: bump_versions(*scopes))
+        return self.created, self.errors
+
+    def ingest_batch(self, items, offset):
+        valid = []
+        for index, item in enumerate(items, offset):
+            serializer = BulkReviewSerializer(data=item)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                self.add_error(index, serializer.errors)
+        if not valid:
+            return
+        titles = set(Title.objects.filter(
+            pk__in={data['title'] for _, data in valid}
+        ).values_list('pk', flat=True))
+        authors = dict(User.objects.filter(
+            username__in={data['author'] for _, data in valid}
+        ).values_list('username', 'pk'))
+        existing = set(Review.objects.filter(
+            title_id__in=titles, author_id__in=authors.values()
+        ).values_list('author_id', 'title_id'))
+        reviews = []
+        for index, data in valid:
+            if data['title'] not in titles:
+                self.add_error(index, {'title': ['Произведение не найдено.']})
+                continue
+            if data['author'] not in authors:
+                self.add_error(
+                    index, {'author': ['Пользователь не найден.']}
+                )
+                continue
+            pair = (authors[data['author']], data['title'])
+            if pair in existing or pair in self.seen:
+                self.add_error(index, {
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        'Можно оставлять только один отзыв!'
+                    ]
+                })
+                continue
+            self.seen.add(pair)
+            reviews.append(Review(
+                author_id=pair[0],
+                title_id=pair[1],
+                text=data['text'],
+                score=data['score']
+            ))
+            self.totals[pair[1]][0] += 1
+            self.totals[pair[1]][1] += data['score']
+            self.scores[pair[1], data['score']] += 1
+        self.assign_change_seqs(reviews)
+        Review.objects.bulk_create(reviews)
+        self.created += len(reviews)
+
+    @staticmethod
+    def assign_change_seqs(reviews):
+        """Выдаёт отзывам номера изменений блоком на произведение."""
+        counts = Counter(review.title_id for review in reviews)
+        next_seqs = {}
+        # Произведения блокируются в одном порядке, чтобы параллельные
+        # загрузки не ждали друг друга по кругу.
+        for title_id, count in sorted(counts.items()):
+            next_seqs[title_id] = (
+                Title.next_change_seq(title_id, count) - count + 1
+            )
+        for review in reviews:
+            review.change_seq = next_seqs[review.title_id]
+            next_seqs[review.title_id] += 1
+
+    def add_error(self, index, errors):
+        self.errors.append({'index': index, 'errors': errors})
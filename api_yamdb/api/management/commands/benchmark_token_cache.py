@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.authentication import CachedJWTAuthentication, TokenCache
+from reviews import constants
+
+
+class Command(BaseCommand):
+    help = 'Compare token validation time with and without the token cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=10000)
+        parser.add_argument(
+            '--tokens', type=int, default=100,
+            help='Number of distinct tokens reused by clients'
+        )
+
+    def handle(self, *args, requests, tokens, **kwargs):
+        raw_tokens = []
+        for user_id in range(1, tokens + 1):
+            token = AccessToken()
+            token['user_id'] = user_id
+            raw_tokens.append(str(token).encode())
+        plain = self.measure(TokenCache(0), raw_tokens, requests)
+        token_cache = TokenCache(constants.TOKEN_CACHE_SIZE)
+        cached = self.measure(token_cache, raw_tokens, requests)
+        stats = token_cache.get_stats()
+        self.stdout.write(
+            f'Without cache: {plain * 10 ** 6:.1f} us/request\n'
+            f'With cache:    {cached * 10 ** 6:.1f} us/request\n'
+            f'Saving:        {(1 - cached / plain) * 100:.0f}%\n'
+            f'Hit ratio:     {stats["hit_ratio"]:.3f} '
+            f'({stats["hits"]} hits, {stats["misses"]} misses)'
+        )
+
+    @staticmethod
+    def measure(token_cache, raw_tokens, requests):
+        authentication = CachedJWTAuthentication()
+        authentication.token_cache = token_cache
+        started = time.perf_counter()
+        for idx in range(requests):
+            authentication.get_validated_token(
+                raw_tokens[idx % len(raw_tokens)]
+            )
+        return (time.perf_counter() - started) / requests
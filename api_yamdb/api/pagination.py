@@ -0,0 +1,270 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from functools import partial
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from api.cache import make_key
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, который берёт количество объектов из кеша."""
+
+    def __init__(self, *args, count_cache_key=None, count_cache_timeout=None,
+                 **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_cache_key = count_cache_key
+        self.count_cache_timeout = count_cache_timeout
+
+    @cached_property
+    def count(self):
+        if self.count_cache_key is None:
+            return super().count
+        count = cache.get(self.count_cache_key)
+        if count is None:
+            count = super().count
+            cache.set(self.count_cache_key, count, self.count_cache_timeout)
+        return count
+
+
+class CachedCountPagination(PageNumberPagination):
+    """Постраничный вывод с кешированием COUNT(*).
+
+    Количество объектов кешируется для пары (адрес, фильтры) и
+    сбрасывается при записи в области из `get_cache_scopes` представления.
+    Параметр `?count=false` отключает подсчёт: поле `count` в ответе
+    будет пустым, а наличие следующей страницы определяется по лишней
+    записи в выборке.
+    """
+
+    count_query_param = 'count'
+    count_cache_timeout = 60 * 5
+    ignored_query_params = ('page', 'count', 'cursor')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        if self.skip_count(request):
+            return self.paginate_without_count(queryset, request)
+        self.count_cache_key = make_key(
+            'count', request, self.get_scopes(queryset, view),
+            self.ignored_query_params
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+    @property
+    def django_paginator_class(self):
+        return partial(
+            CachedCountPaginator,
+            count_cache_key=self.count_cache_key,
+            count_cache_timeout=self.count_cache_timeout
+        )
+
+    def skip_count(self, request):
+        value = request.query_params.get(self.count_query_param, '')
+        return value.lower() in ('false', '0', 'no')
+
+    @staticmethod
+    def get_scopes(queryset, view):
+        get_cache_scopes = getattr(view, 'get_cache_scopes', None)
+        scopes = get_cache_scopes() if get_cache_scopes else None
+        return scopes or (queryset.model._meta.model_name,)
+
+    def paginate_without_count(self, queryset, request):
+        self.page = None
+        try:
+            self.page_number = int(
+                request.query_params.get(self.page_query_param, 1)
+            )
+        except ValueError:
+            self.page_number = 0
+        if self.page_number < 1:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=request.query_params.get(self.page_query_param),
+                message='Неверный номер страницы.'
+            ))
+        offset = (self.page_number - 1) * self.page_size
+        results = list(queryset[offset:offset + self.page_size + 1])
+        if not results and self.page_number > 1:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=self.page_number,
+                message='Страница не содержит результатов.'
+            ))
+        self.has_next = len(results) > self.page_size
+        return results[:self.page_size]
+
+    def get_paginated_response(self, data):
+        if self.page is not None:
+            return super().get_paginated_response(data)
+        return Response({
+            'count': None,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data
+        })
+
+    def get_next_link(self):
+        if self.page is not None:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.page_query_param,
+            self.page_number + 1
+        )
+
+    def get_previous_link(self):
+        if self.page is not None:
+            return super().get_previous_link()
+        if self.page_number == 1:
+            return None
+        url = self.request.build_absolute_uri()
+        if self.page_number == 2:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(
+            url, self.page_query_param, self.page_number - 1
+        )
+
+
+class KeysetPagination(BasePagination):
+    """Постраничный вывод по курсору без OFFSET и COUNT(*).
+
+    Курсор хранит значения полей `ordering` граничной записи, поэтому
+    стоимость любой страницы не зависит от её номера. Последнее поле
+    в `ordering` должно быть уникальным.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    ordering = ('id',)
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        values, self.reverse = self.decode_cursor(request)
+        if values is not None:
+            values = self.clean_cursor(queryset.model, values)
+        ordering = self.ordering
+        if self.reverse:
+            ordering = tuple(self.invert(field) for field in ordering)
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self.position_filter(ordering, values))
+        try:
+            results = list(queryset[:self.page_size + 1])
+        except OverflowError:
+            # SQLite проверяет диапазон целых только при выполнении запроса.
+            raise NotFound(self.invalid_cursor_message)
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if self.reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, values is not None
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data
+        })
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    @staticmethod
+    def invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def position_filter(ordering, values):
+        """Строит условие «строго после позиции» для набора полей."""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            values, reverse = payload['p'], bool(payload['r'])
+        except (BinasciiError, KeyError, TypeError, UnicodeError,
+                ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def clean_cursor(self, model, values):
+        """Приводит значения курсора к типам полей `ordering`."""
+        try:
+            values = [
+                model._meta.get_field(field.lstrip('-')).clean(value, None)
+                for field, value in zip(self.ordering, values)
+            ]
+        except (TypeError, ValidationError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if any(value is None for value in values):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def encode_cursor(self, item, reverse):
+        values = [getattr(item, field.lstrip('-')) for field in self.ordering]
+        payload = json.dumps(
+            {'p': values, 'r': int(reverse)},
+            default=self.encode_value,
+            separators=(',', ':')
+        )
+        encoded = urlsafe_b64encode(payload.encode()).decode('ascii')
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    @staticmethod
+    def encode_value(value):
+        # В отличие от DjangoJSONEncoder сохраняет микросекунды.
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return str(value)
+
+    def get_schema_operation_parameters(self, view):
+        return [{
+            'name': self.cursor_query_param,
+            'required': False,
+            'in': 'query',
+            'schema': {'type': 'string'},
+        }]
+
+
+class TitleCursorPagination(KeysetPagination):
+    ordering = ('name', 'id')
+
+
+class PubDateCursorPagination(KeysetPagination):
+    ordering = ('-pub_date', '-id')
@@ -3,11 +3,11 @@ import re
 from django.contrib.auth.tokens import default_token_generator
 from django.shortcuts import get_object_or_404
 from rest_framework import serializers
-from rest_framework.exceptions import ValidationError
 from rest_framework.relations import SlugRelatedField
 
 from reviews import constants
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.models import (Category, Comment, Genre, Review, Title,
+                            Tombstone, User)
 
 
 class GenreSerializer(serializers.ModelSerializer):
@@ -37,19 +37,23 @@ class ReviewSerializer(serializers.ModelSerializer):
             'text',
             'author',
             'score',
-            'pub_date'
+            'pub_date',
+            'comment_count'
         )
+        read_only_fields = ('comment_count',)
         model = Review
 
-    def validate(self, data):
-        request = self.context['request']
-        author = request.user
-        title_id = self.context['view'].kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        if request.method == 'POST':
-            if title.reviews.filter(author=author).exists():
-                raise ValidationError('Можно оставлять только один отзыв!')
-        return data
+
+class BulkReviewSerializer(serializers.Serializer):
+    """Отзыв для пакетной загрузки; ссылки проверяются пакетом целиком."""
+
+    title = serializers.IntegerField()
+    author = serializers.CharField(max_length=constants.MAX_LENGTH_USERNAME)
+    text = serializers.CharField()
+    score = serializers.IntegerField(
+        min_value=constants.MIN_SCORE,
+        max_value=constants.MAX_SCORE
+    )
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -68,6 +72,34 @@ class CommentSerializer(serializers.ModelSerializer):
         )
 
 
+class ReviewWithCommentsSerializer(ReviewSerializer):
+    """Отзыв с последними комментариями, загруженными в `latest_comments`."""
+
+    comments = CommentSerializer(
+        many=True,
+        read_only=True,
+        source='latest_comments'
+    )
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ('comments',)
+
+
+class CommentChangeSerializer(CommentSerializer):
+    review = serializers.PrimaryKeyRelatedField(read_only=True)
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ('review',)
+
+
+class TombstoneSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source='object_id')
+
+    class Meta:
+        model = Tombstone
+        fields = ('kind', 'id', 'deleted_at')
+
+
 class UserSerializer(serializers.ModelSerializer):
     username = serializers.CharField(max_length=constants.MAX_LENGTH_USERNAME)
 
@@ -188,7 +220,15 @@ class TitleReadSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = '__all__'
+        fields = (
+            'id',
+            'name',
+            'year',
+            'rating',
+            'description',
+            'genre',
+            'category'
+        )
         model = Title
 
 
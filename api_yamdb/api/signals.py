@@ -0,0 +1,147 @@
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_save)
+
+from api.authentication import forget_user, revoke_claims
+from api.cache import (COMMENTS_SCOPE, REVIEWS_SCOPE, TITLE_SCOPE,
+                       bump_versions)
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+VERSIONED_MODELS = {
+    Category: 'category',
+    Genre: 'genre',
+    User: 'user',
+}
+
+
+def bump_on_commit(*scopes):
+    transaction.on_commit(lambda: bump_versions(*scopes))
+
+
+def bump_model_version(sender, **kwargs):
+    bump_on_commit(VERSIONED_MODELS[sender])
+
+
+def bump_title_scopes(*title_ids, scopes=('title',)):
+    bump_on_commit(*scopes, *(
+        TITLE_SCOPE.format(title_id) for title_id in title_ids
+    ))
+
+
+def bump_changed_title(sender, instance, **kwargs):
+    bump_title_scopes(instance.pk)
+
+
+def bump_deleted_title(sender, instance, **kwargs):
+    bump_title_scopes(instance.pk, scopes=(
+        'title', REVIEWS_SCOPE.format(instance.pk)
+    ))
+
+
+def bump_title_genres(sender, instance, action, reverse, pk_set,
+                      **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        bump_title_scopes(instance.pk)
+    elif pk_set:
+        bump_title_scopes(*pk_set)
+    else:
+        # Очистка со стороны жанра не сообщает, какие произведения
+        # затронуты, поэтому сбрасывается версия всех жанров.
+        bump_title_scopes(scopes=('title', 'genre'))
+
+
+def bump_title_rating(sender, instance, created=True, raw=False, **kwargs):
+    # Рейтинг меняется только при создании, удалении и смене оценки.
+    previous = getattr(instance, '_previous', None)
+    if raw or (not created and (previous is None or (
+        previous['title_id'] == instance.title_id
+        and previous['score'] == instance.score
+    ))):
+        return
+    title_ids = {instance.title_id}
+    if previous is not None:
+        title_ids.add(previous['title_id'])
+    bump_title_scopes(*title_ids, scopes=('rating',))
+
+
+def bump_review_scopes(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_on_commit(
+            REVIEWS_SCOPE.format(instance.title_id),
+            COMMENTS_SCOPE.format(instance.pk)
+        )
+
+
+def bump_comment_scopes(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_on_commit(
+            REVIEWS_SCOPE.format(instance.title_id),
+            COMMENTS_SCOPE.format(instance.review_id)
+        )
+
+
+def forget_cached_user(sender, instance, **kwargs):
+    user_id = instance.pk
+    transaction.on_commit(lambda: forget_user(user_id))
+
+
+def get_claims(user):
+    return (user.role, user.is_superuser, user.is_active)
+
+
+def remember_user_state(sender, instance, raw, update_fields, **kwargs):
+    instance._claims = instance._username = None
+    if raw or instance._state.adding or (
+        update_fields is not None and not {
+            'username', 'role', 'is_superuser', 'is_active'
+        } & set(update_fields)
+    ):
+        return
+    stored = User.objects.filter(pk=instance.pk).values_list(
+        'username', 'role', 'is_superuser', 'is_active'
+    ).first()
+    if stored is not None:
+        instance._username, *claims = stored
+        instance._claims = tuple(claims)
+
+
+def revoke_changed_claims(sender, instance, **kwargs):
+    previous = getattr(instance, '_claims', None)
+    if previous is not None and previous != get_claims(instance):
+        user_id = instance.pk
+        transaction.on_commit(lambda: revoke_claims(user_id))
+
+
+def bump_changed_username(sender, instance, **kwargs):
+    # Отзывы и комментарии показывают имя автора, поэтому их версии
+    # зависят от общей области 'username', которая меняется редко.
+    previous = getattr(instance, '_username', None)
+    if previous is not None and previous != instance.username:
+        bump_on_commit('username')
+
+
+def revoke_deleted_claims(sender, instance, **kwargs):
+    user_id = instance.pk
+    transaction.on_commit(lambda: revoke_claims(user_id))
+
+
+for model in VERSIONED_MODELS:
+    post_save.connect(bump_model_version, sender=model)
+    post_delete.connect(bump_model_version, sender=model)
+post_save.connect(bump_changed_title, sender=Title)
+post_delete.connect(bump_deleted_title, sender=Title)
+m2m_changed.connect(bump_title_genres, sender=Title.genre.through)
+post_save.connect(bump_title_rating, sender=Review)
+post_delete.connect(bump_title_rating, sender=Review)
+post_save.connect(bump_review_scopes, sender=Review)
+post_delete.connect(bump_review_scopes, sender=Review)
+post_save.connect(bump_comment_scopes, sender=Comment)
+post_delete.connect(bump_comment_scopes, sender=Comment)
+post_save.connect(forget_cached_user, sender=User)
+post_delete.connect(forget_cached_user, sender=User)
+pre_save.connect(remember_user_state, sender=User)
+post_save.connect(revoke_changed_claims, sender=User)
+post_save.connect(bump_changed_username, sender=User)
+post_delete.connect(revoke_deleted_claims, sender=User)
@@ -0,0 +1,97 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+
+from django.utils.functional import cached_property
+from rest_framework.exceptions import ValidationError
+
+from reviews import constants
+from reviews.models import Comment, Tombstone
+
+
+class ChangeFeed:
+    """Изменения отзывов и комментариев произведения после курсора.
+
+    Каждая запись и отметка об удалении получает номер изменения из
+    счётчика произведения (`Title.next_change_seq`). Номера выдаются под
+    блокировкой строки произведения, поэтому изменение, закоммиченное
+    позже, всегда получает номер больше уже отданных, и курсор хранит
+    только последний номер. Потоки читаются по индексам
+    (title, change_seq) и сливаются в одну страницу; если изменений
+    больше, `has_more` будет истинным и клиент повторяет запрос с новым
+    курсором. Курсор, выданный до последней очистки отметок об удалении
+    (`Title.pruned_seq`), отклоняется: по нему можно пропустить
+    удаление.
+    """
+
+    page_size = constants.SYNC_PAGE_SIZE
+    invalid_cursor_message = 'Неверный курсор.'
+    expired_cursor_message = (
+        'Курсор устарел, синхронизируйтесь заново без него.'
+    )
+
+    def __init__(self, title, since=None):
+        self.title = title
+        self.since = self.decode_cursor(since)
+        if 0 < self.since < title.pruned_seq:
+            raise ValidationError({'since': [self.expired_cursor_message]})
+
+    def get_streams(self):
+        return {
+            'reviews': self.title.reviews.select_related('author'),
+            'comments': Comment.objects.filter(title=self.title)
+            .select_related('author'),
+            'deleted': Tombstone.objects.filter(title_id=self.title.pk),
+        }
+
+    @cached_property
+    def fetched(self):
+        """До page_size + 1 изменений после курсора по возрастанию номера."""
+        changes = []
+        for stream, queryset in self.get_streams().items():
+            changes += [
+                (item.change_seq, stream, item)
+                for item in queryset.filter(change_seq__gt=self.since)
+                .order_by('change_seq')[:self.page_size + 1]
+            ]
+        # Номера не повторяются, поэтому первые изменения слияния
+        # совпадают с первыми изменениями произведения.
+        changes.sort(key=lambda change: change[0])
+        return changes[:self.page_size + 1]
+
+    @property
+    def changes(self):
+        return self.fetched[:self.page_size]
+
+    @property
+    def has_more(self):
+        return len(self.fetched) > self.page_size
+
+    def get_stream(self, name):
+        return [item for _, stream, item in self.changes if stream == name]
+
+    def get_reviews(self):
+        return self.get_stream('reviews')
+
+    def get_comments(self):
+        return self.get_stream('comments')
+
+    def get_deleted(self):
+        return self.get_stream('deleted')
+
+    def decode_cursor(self, encoded):
+        if not encoded:
+            return 0
+        try:
+            since = json.loads(urlsafe_b64decode(encoded.encode('ascii')))['s']
+            if type(since) is not int or since < 0:
+                raise ValueError
+        except (BinasciiError, KeyError, TypeError, UnicodeError,
+                ValueError):
+            raise ValidationError({'since': [self.invalid_cursor_message]})
+        return since
+
+    def get_cursor(self):
+        since = self.changes[-1][0] if self.changes else self.since
+        payload = json.dumps({'s': since}, separators=(',', ':'))
+        return urlsafe_b64encode(payload.encode()).decode('ascii')
@@ -0,0 +1,104 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """Ограничение частоты запросов скользящим окном.
+
+    Запросы считаются в окнах длиной `duration` секунд. Число запросов
+    за последние `duration` секунд оценивается как счётчик текущего окна
+    плюс доля счётчика предыдущего, ещё попадающая в скользящее окно.
+
+    Счётчики хранятся в кеше THROTTLE_CACHE_ALIAS, общем для всех
+    процессов, и меняются только атомарными `add` и `incr`, без
+    блокировок. Решение принимается по значению после `incr`, поэтому
+    одновременные запросы не превышают лимит. Отклонённые запросы лимит
+    не занимают: если оценка уже превышена, счётчик не меняется.
+    """
+
+    cache_format = 'api:throttle:%(scope)s:%(ident)s'
+    window_format = '%s:%d'
+
+    @property
+    def cache(self):
+        return caches[settings.THROTTLE_CACHE_ALIAS]
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        window, self.elapsed = divmod(self.timer(), self.duration)
+        current = self.window_format % (self.key, window)
+        previous = self.window_format % (self.key, window - 1)
+        stored = self.cache.get_many([previous, current])
+        self.previous = stored.get(previous, 0)
+        self.count = stored.get(current, 0)
+        if self.estimate(self.count + 1) > self.num_requests:
+            return False
+        # Счётчик нужен ещё одно окно как предыдущий.
+        self.cache.add(current, 0, self.duration * 2)
+        count = self.cache.incr(current)
+        if self.estimate(count) <= self.num_requests:
+            return True
+        self.count = self.cache.decr(current)
+        return False
+
+    def estimate(self, count):
+        """Оценка числа запросов за последние `duration` секунд."""
+        return self.previous * (1 - self.elapsed / self.duration) + count
+
+    def wait(self):
+        free = self.num_requests - self.count - 1
+        if free >= 0 and self.previous:
+            # Доля предыдущего окна уменьшится в текущем окне.
+            wait = self.duration * (1 - free / self.previous) - self.elapsed
+            if wait < self.duration - self.elapsed:
+                return max(wait, 0)
+        # Текущее окно станет предыдущим, и его доля уменьшится.
+        wait = self.duration - self.elapsed
+        if self.count >= self.num_requests:
+            wait += self.duration * (1 - (self.num_requests - 1) / self.count)
+        return wait
+
+
+class IPThrottle(SlidingWindowThrottle):
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request)
+        }
+
+
+class UsernameThrottle(SlidingWindowThrottle):
+
+    def get_cache_key(self, request, view):
+        data = request.data
+        username = data.get('username') if hasattr(data, 'get') else None
+        if not isinstance(username, str) or not username:
+            return None
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': hashlib.md5(username.encode()).hexdigest()
+        }
+
+
+class SignupIPThrottle(IPThrottle):
+    scope = 'signup_ip'
+
+
+class SignupUsernameThrottle(UsernameThrottle):
+    scope = 'signup_username'
+
+
+class TokenIPThrottle(IPThrottle):
+    scope = 'token_ip'
+
+
+class TokenUsernameThrottle(UsernameThrottle):
+    scope = 'token_username'
@@ -2,8 +2,8 @@ from django.urls import include, path
 from rest_framework import routers
 
 from api.views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                       ReviewViewSet, TitleViewSet, UserViewSet, get_token,
-                       register)
+                       ReviewViewSet, TitleViewSet, UserViewSet,
+                       bulk_create_reviews, get_token, register)
 
 v1_router = routers.DefaultRouter()
 v1_router.register('titles', TitleViewSet, basename='title')
@@ -25,6 +25,7 @@ auth_patterns = [
 ]
 
 v1_urlpatterns = [
+    path('reviews/bulk/', bulk_create_reviews, name='reviews-bulk'),
     path('', include(v1_router.urls)),
     path('auth/', include(auth_patterns)),
 ]
@@ -1,41 +1,172 @@
+from contextlib import contextmanager
+
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import OuterRef, Prefetch, Subquery
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, mixins, permissions, status, viewsets
-from rest_framework.decorators import action, api_view, permission_classes
-from rest_framework.pagination import PageNumberPagination
+from rest_framework import generics, mixins, permissions, status, viewsets
+from rest_framework.decorators import (action, api_view, permission_classes,
+                                       throttle_classes)
+from rest_framework.exceptions import (APIException, AuthenticationFailed,
+                                       ValidationError)
 from rest_framework.permissions import (IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.settings import api_settings
 
-from api.filters import TitlesFilter
+from api.authentication import get_tokens_for_user
+from api.cache import (COMMENTS_SCOPE, REVIEWS_SCOPE, TITLE_SCOPE,
+                       get_digest, get_versions, make_key)
+from api.export import export_reviews
+from api.filters import TitlesFilter, TrigramSearchFilter
+from api.ingest import ReviewIngest
+from api.pagination import (CachedCountPagination, PubDateCursorPagination,
+                            TitleCursorPagination)
 from api.permissions import (IsAdmin, IsAdminOrOwnerOrReadOnly,
                              IsAdminOrReadOnly)
-from api.serializers import (CategorySerializer, CommentSerializer,
-                             GenreSerializer, GetTokenSerializer,
-                             RegisterSerializer, ReviewSerializer,
+from api.serializers import (CategorySerializer, CommentChangeSerializer,
+                             CommentSerializer, GenreSerializer,
+                             GetTokenSerializer, RegisterSerializer,
+                             ReviewSerializer, ReviewWithCommentsSerializer,
                              TitleReadSerializer, TitleWriteSerializer,
-                             UserAdminSerializer, UserSerializer)
+                             TombstoneSerializer, UserAdminSerializer,
+                             UserSerializer)
+from api.sync import ChangeFeed
+from api.throttling import (SignupIPThrottle, SignupUsernameThrottle,
+                            TokenIPThrottle, TokenUsernameThrottle)
 from reviews import constants
-from reviews.models import Category, Genre, Review, Title, User
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.outbox import enqueue_email
 
 
 class GeneralRequirements:
-    filter_backends = (filters.SearchFilter,)
+    filter_backends = (TrigramSearchFilter,)
     search_fields = ('name',)
-    pagination_class = PageNumberPagination
+    pagination_class = CachedCountPagination
     permission_classes = (IsAdminOrReadOnly,)
     lookup_field = 'slug'
 
 
+class CursorPaginationMixin:
+    """Включает пагинацию по курсору, если в запросе передан `cursor`."""
+
+    cursor_pagination_class = None
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            pagination_class = self.pagination_class
+            if (self.cursor_pagination_class is not None
+                    and self.cursor_pagination_class.cursor_query_param
+                    in self.request.query_params):
+                pagination_class = self.cursor_pagination_class
+            self._paginator = (
+                pagination_class() if pagination_class is not None else None
+            )
+        return self._paginator
+
+
+class CacheScopesMixin:
+    """Области версий данных, от которых зависит ответ.
+
+    По умолчанию это `cache_scopes`; представление может сузить их для
+    отдельного действия, переопределив `get_cache_scopes`.
+    """
+
+    cache_scopes = ()
+
+    def get_cache_scopes(self):
+        return self.cache_scopes
+
+
+class AnonymousCacheMixin(CacheScopesMixin):
+    """Кеширует ответы на GET-запросы анонимных пользователей.
+
+    Ключ строится по адресу и нормализованным параметрам запроса и
+    включает версии из `get_cache_scopes`, поэтому запись в любую из
+    областей делает старые ответы недостижимыми.
+    """
+
+    response_cache_timeout = 60 * 5
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+        key = make_key('response', request, self.get_cache_scopes())
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, self.response_cache_timeout)
+        return response
+
+
+class NotModified(APIException):
+    status_code = status.HTTP_304_NOT_MODIFIED
+
+
+class ConditionalGetMixin(CacheScopesMixin):
+    """Поддержка условных GET-запросов для list и retrieve.
+
+    ETag и Last-Modified вычисляются по версиям из `get_cache_scopes`
+    ещё до выборки из базы и сериализации, поэтому ответ 304 почти
+    ничего не стоит.
+    """
+
+    conditional_actions = ('list', 'retrieve')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.etag = self.last_modified = None
+        if (request.method not in ('GET', 'HEAD')
+                or self.action not in self.conditional_actions):
+            return
+        versions = get_versions(*self.get_cache_scopes())
+        self.etag = '"{}"'.format(get_digest(
+            request, versions, extra=request.accepted_renderer.format
+        ))
+        self.last_modified = max(versions.values()) // 10 ** 9
+        if get_conditional_response(
+            request._request,
+            etag=self.etag,
+            last_modified=self.last_modified
+        ) is not None:
+            raise NotModified
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=exc.status_code)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if getattr(self, 'etag', None) is not None and (
+            response.status_code in (status.HTTP_200_OK,
+                                     status.HTTP_304_NOT_MODIFIED)
+        ):
+            response['ETag'] = self.etag
+            response['Last-Modified'] = http_date(self.last_modified)
+        return response
+
+
 class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserAdminSerializer
     permission_classes = (IsAdmin,)
-    filter_backends = (filters.SearchFilter,)
+    filter_backends = (TrigramSearchFilter,)
     http_method_names = ['get', 'post', 'patch', 'delete']
     search_fields = ('username',)
     lookup_field = 'username'
@@ -46,11 +177,16 @@ class UserViewSet(viewsets.ModelViewSet):
             url_path=constants.ME_URL,
             pagination_class=None)
     def me(self, request):
-        user = get_object_or_404(User, username=self.request.user)
-        serializer = self.get_serializer(self.request.user)
         if request.method == 'GET':
-            serializer = self.get_serializer(request.user)
+            user = request.user
+            if not isinstance(user, User):
+                # Пользователь из токена, полный профиль берётся из базы.
+                user = get_object_or_404(User, pk=user.pk)
+            serializer = self.get_serializer(user)
             return Response(serializer.data, status=status.HTTP_200_OK)
+        # Пользователь в запросе может быть взят из кеша, поэтому
+        # изменения сохраняются в свежую запись из базы.
+        user = get_object_or_404(User, pk=request.user.pk)
         serializer = self.get_serializer(
             user,
             data=request.data,
@@ -63,51 +199,122 @@ class UserViewSet(viewsets.ModelViewSet):
 
 @api_view(['POST'])
 @permission_classes((permissions.AllowAny,))
+@throttle_classes((SignupIPThrottle, SignupUsernameThrottle))
 def register(request):
     serializer = RegisterSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
-    user = serializer.save()
-    confirmation_code = default_token_generator.make_token(user)
-    send_mail(
-        'Код подтверждения',
-        f'Ваш код для подтверждения: {confirmation_code}',
-        constants.EMAIL_ADMIN,
-        [user.email]
-    )
+    # Письмо отправляет команда send_outbox; запись в очередь идёт
+    # в одной транзакции с пользователем.
+    with transaction.atomic():
+        user = serializer.save()
+        enqueue_email(
+            'Код подтверждения',
+            'Ваш код для подтверждения: '
+            f'{default_token_generator.make_token(user)}',
+            user.email
+        )
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
 @permission_classes((permissions.AllowAny,))
+@throttle_classes((TokenIPThrottle, TokenUsernameThrottle))
 def get_token(request):
     serializer = GetTokenSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     user = serializer.validated_data['user']
-    refresh = RefreshToken.for_user(user)
+    refresh = get_tokens_for_user(user)
     return Response({
         'refresh': str(refresh),
         'access': str(refresh.access_token),
     })
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all().annotate(
-        rating=Avg('reviews__score')
+@api_view(['POST'])
+@permission_classes((IsAdmin,))
+def bulk_create_reviews(request):
+    items = request.data
+    if not isinstance(items, list) or not items:
+        raise ValidationError({
+            api_settings.NON_FIELD_ERRORS_KEY: ['Ожидается список отзывов.']
+        })
+    if len(items) > constants.BULK_REVIEWS_MAX:
+        raise ValidationError({
+            api_settings.NON_FIELD_ERRORS_KEY: [
+                'За один запрос можно загрузить не больше '
+                f'{constants.BULK_REVIEWS_MAX} отзывов.'
+            ]
+        })
+    try:
+        created, errors = ReviewIngest().run(items)
+    except IntegrityError:
+        # Отзыв с той же парой автор-произведение появился параллельно.
+        return Response(
+            {'detail': 'Отзывы изменились во время загрузки, '
+                       'повторите запрос.'},
+            status=status.HTTP_409_CONFLICT
+        )
+    return Response(
+        {'created': created, 'errors': errors},
+        status=(status.HTTP_201_CREATED if created
+                else status.HTTP_400_BAD_REQUEST)
+    )
+
+
+class TitleViewSet(ConditionalGetMixin, AnonymousCacheMixin,
+                   CursorPaginationMixin, viewsets.ModelViewSet):
+    queryset = Title.objects.select_related('category').prefetch_related(
+        'genre'
     ).order_by('name')
     http_method_names = ['get', 'post', 'patch', 'delete']
     filter_backends = (DjangoFilterBackend,)
     filterset_class = (TitlesFilter)
     filterser_fields = ('category', 'genre', 'name', 'year')
-    pagination_class = PageNumberPagination
+    pagination_class = CachedCountPagination
+    cursor_pagination_class = TitleCursorPagination
+    cache_scopes = ('title', 'category', 'genre', 'rating')
+    conditional_actions = ('list', 'retrieve', 'rating_distribution')
     permission_classes = (IsAdminOrReadOnly,)
 
+    def get_cache_scopes(self):
+        # Одно произведение зависит только от своей версии, а не от
+        # изменений во всём каталоге.
+        if self.action == 'retrieve':
+            return (TITLE_SCOPE.format(self.kwargs['pk']), 'category',
+                    'genre')
+        if self.action == 'rating_distribution':
+            return (TITLE_SCOPE.format(self.kwargs['pk']),)
+        return super().get_cache_scopes()
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    @action(detail=True, methods=['GET'], url_path='rating-distribution')
+    def rating_distribution(self, request, pk=None):
+        return self.get_cached_response(
+            self.get_rating_distribution, request, pk=pk
+        )
+
+    def get_rating_distribution(self, request, pk=None):
+        # Версия из DRF отвечает 404 и на нечисловой pk.
+        title = generics.get_object_or_404(Title.objects.only('id'), pk=pk)
+        counts = dict(title.score_counts.values_list('score', 'count'))
+        return Response([
+            {'score': score, 'count': counts.get(score, 0)}
+            for score in range(constants.MIN_SCORE, constants.MAX_SCORE + 1)
+        ])
+
     def get_serializer_class(self):
         if self.action in ('list', 'retrieve'):
             return TitleReadSerializer
         return TitleWriteSerializer
 
 
-class BaseViewSet(GeneralRequirements,
+class BaseViewSet(ConditionalGetMixin,
+                  AnonymousCacheMixin,
+                  GeneralRequirements,
                   mixins.CreateModelMixin,
                   mixins.ListModelMixin,
                   mixins.DestroyModelMixin,
@@ -118,11 +325,13 @@ class BaseViewSet(GeneralRequirements,
 class CategoryViewSet(BaseViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_scopes = ('category',)
 
 
 class GenreViewSet(BaseViewSet):
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    cache_scopes = ('genre',)
 
 
 class PersonPermission:
@@ -131,35 +340,201 @@ class PersonPermission:
     ordering = ('name',)
 
 
-class ReviewViewSet(PersonPermission, viewsets.ModelViewSet):
+class NestedParentMixin:
+    """Загружает родительский объект вложенного маршрута один раз.
+
+    Экземпляр представления живёт один запрос, поэтому объект кешируется
+    на нём и передаётся сериализатору через контекст под именем
+    `parent_context_name`. Разрешения получают его через `view`.
+    """
+
+    parent_model = None
+    parent_lookup = {}
+    parent_context_name = 'parent'
+
+    def get_parent(self):
+        if not hasattr(self, '_parent'):
+            self._parent = get_object_or_404(self.parent_model, **{
+                field: self.kwargs.get(kwarg)
+                for field, kwarg in self.parent_lookup.items()
+            })
+        return self._parent
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context[self.parent_context_name] = self.get_parent()
+        return context
+
+
+def violates_constraint(error, model, name):
+    """Нарушено ли ошибкой IntegrityError ограничение name модели.
+
+    PostgreSQL и MySQL называют ограничение в тексте ошибки, SQLite
+    перечисляет его столбцы.
+    """
+    constraint = next(
+        constraint for constraint in model._meta.constraints
+        if constraint.name == name
+    )
+    columns = ', '.join(
+        f'{model._meta.db_table}.{model._meta.get_field(field).column}'
+        for field in constraint.fields
+    )
+    message = str(error)
+    return name in message or columns in message
+
+
+@contextmanager
+def existing_author(user):
+    """Превращает ошибку записи от удалённого пользователя в ответ 401.
+
+    Пользователь из токена (StatelessJWTAuthentication) не сверяется
+    с базой. Если его удалили в обход сигналов, отметки об отзыве нет,
+    и запись с ним в качестве автора нарушает внешний ключ. Наличие
+    пользователя проверяется только после такой ошибки.
+    """
+    try:
+        yield
+    except IntegrityError:
+        if not User.objects.filter(pk=user.id).exists():
+            raise AuthenticationFailed(
+                'Пользователь не найден.', code='user_not_found'
+            )
+        raise
+
+
+class ReviewViewSet(ConditionalGetMixin, NestedParentMixin,
+                    CursorPaginationMixin, PersonPermission,
+                    viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
+    cursor_pagination_class = PubDateCursorPagination
+    parent_model = Title
+    parent_lookup = {'pk': 'title_id'}
+    parent_context_name = 'title'
+    comments_query_param = 'comments'
+
+    def get_cache_scopes(self):
+        # Версия отзывов произведения сдвигается и при записи
+        # комментариев: отзыв содержит их счётчик и последние из них.
+        return (REVIEWS_SCOPE.format(self.kwargs['title_id']), 'username')
 
     def get_title(self):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, pk=title_id)
-        return title
+        return self.get_parent()
+
+    def get_comments_limit(self):
+        """Сколько последних комментариев встроить в каждый отзыв."""
+        value = self.request.query_params.get(self.comments_query_param)
+        if self.action != 'list' or value is None:
+            return 0
+        try:
+            limit = int(value)
+        except ValueError:
+            limit = -1
+        if limit < 0:
+            raise ValidationError({
+                self.comments_query_param: [
+                    'Укажите неотрицательное целое число.'
+                ]
+            })
+        return min(limit, constants.MAX_EMBEDDED_COMMENTS)
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        queryset = self.get_title().reviews.select_related('author')
+        limit = self.get_comments_limit()
+        if not limit:
+            return queryset
+        # Для всех отзывов страницы комментарии загружаются одним запросом:
+        # в каждый отзыв попадают первые `limit` строк по индексу
+        # comment_review_pub_date_idx.
+        latest = Comment.objects.filter(
+            review=OuterRef('review')
+        ).order_by('-pub_date', '-id').values('pk')[:limit]
+        return queryset.prefetch_related(Prefetch(
+            'comments',
+            queryset=Comment.objects.filter(pk__in=Subquery(latest))
+            .select_related('author')
+            .order_by('-pub_date', '-id'),
+            to_attr='latest_comments'
+        ))
+
+    def get_serializer_class(self):
+        if self.get_comments_limit():
+            return ReviewWithCommentsSerializer
+        return super().get_serializer_class()
+
+    @action(detail=False, methods=['GET'])
+    def changes(self, request, title_id=None):
+        feed = ChangeFeed(self.get_title(), request.query_params.get('since'))
+        context = self.get_serializer_context()
+        return Response({
+            'reviews': self.get_serializer(
+                feed.get_reviews(), many=True
+            ).data,
+            'comments': CommentChangeSerializer(
+                feed.get_comments(), many=True, context=context
+            ).data,
+            'deleted': TombstoneSerializer(
+                feed.get_deleted(), many=True, context=context
+            ).data,
+            'since': feed.get_cursor(),
+            'has_more': feed.has_more
+        })
+
+    @action(detail=False, methods=['GET'], permission_classes=(IsAdmin,))
+    def export(self, request, title_id=None):
+        include = request.query_params.get('include', '').split(',')
+        response = StreamingHttpResponse(
+            export_reviews(self.get_title(), 'comments' in include),
+            content_type='application/x-ndjson; charset=utf-8'
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="title-{title_id}-reviews.ndjson"'
+        )
+        return response
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.get_title())
+        # Единственность отзыва гарантирует ограничение unique_review,
+        # отдельная проверка перед вставкой была бы лишним запросом
+        # и всё равно не защищала бы от гонки.
+        with existing_author(self.request.user):
+            try:
+                serializer.save(
+                    author_id=self.request.user.id, title=self.get_title()
+                )
+            except IntegrityError as error:
+                if not violates_constraint(error, Review, 'unique_review'):
+                    raise
+                raise ValidationError({
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        'Можно оставлять только один отзыв!'
+                    ]
+                })
 
 
 class CommentViewSet(
+    ConditionalGetMixin,
+    NestedParentMixin,
+    CursorPaginationMixin,
     PersonPermission,
     viewsets.ModelViewSet
 ):
     serializer_class = CommentSerializer
+    cursor_pagination_class = PubDateCursorPagination
+    parent_model = Review
+    parent_lookup = {'pk': 'review_id', 'title': 'title_id'}
+    parent_context_name = 'review'
+
+    def get_cache_scopes(self):
+        return (COMMENTS_SCOPE.format(self.kwargs['review_id']), 'username')
 
     def get_review(self):
-        review_id = self.kwargs.get('review_id')
-        title_id = self.kwargs.get('title_id')
-        review = get_object_or_404(Review, pk=review_id, title=title_id)
-        return review
+        return self.get_parent()
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        return self.get_review().comments.select_related('author')
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, review=self.get_review())
+        with existing_author(self.request.user):
+            serializer.save(
+                author_id=self.request.user.id, review=self.get_review()
+            )
@@ -1,3 +1,4 @@
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -61,6 +62,12 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Тестовая база в файле, а не в памяти: у разделяемой базы
+        # в памяти блокировки таблиц не ждут освобождения, и
+        # параллельные запросы в тестах падают с ошибкой.
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
@@ -103,20 +110,66 @@ STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
 
 AUTH_USER_MODEL = 'reviews.User'
 
+# Адрес memcached, общего для всех процессов, например 127.0.0.1:11211.
+# Memcached запускается с ключом -M, чтобы не вытеснять записи.
+SHARED_CACHE_LOCATION = os.getenv('SHARED_CACHE_LOCATION')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api_yamdb',
+    },
+    # Общий для всех процессов кеш: сброс записи о пользователе в одном
+    # процессе должен быть виден остальным. Без SHARED_CACHE_LOCATION
+    # кеш хранится в памяти процесса, что годится только для разработки
+    # с одним процессом.
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+        'LOCATION': SHARED_CACHE_LOCATION,
+    } if SHARED_CACHE_LOCATION else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api_yamdb_shared',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10 ** 6,
+        },
+    },
+}
+
+SHARED_CACHE_ALIAS = 'shared'
+
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS':
-    'rest_framework.pagination.PageNumberPagination',
+    'api.pagination.CachedCountPagination',
     'PAGE_SIZE': 10,
 
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
 
+    # StatelessJWTAuthentication проверяет роли по токену без запроса
+    # к таблице пользователей; включается здесь вместо
+    # CachedJWTAuthentication и требует общего кеша SHARED_CACHE_ALIAS.
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
+
+    # Число прокси перед приложением. Ограничения частоты по IP берут
+    # адрес из X-Forwarded-For только от них, а не от клиента.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
+
+    'DEFAULT_THROTTLE_RATES': {
+        'signup_ip': '10/min',
+        'signup_username': '3/min',
+        'token_ip': '20/min',
+        'token_username': '5/min',
+    },
 }
 
+# Кеш для счётчиков DEFAULT_THROTTLE_RATES: лимиты действуют на все
+# процессы, только если кеш общий для них, а счётчики меняются атомарным
+# incr, как в memcached.
+THROTTLE_CACHE_ALIAS = SHARED_CACHE_ALIAS
+
 
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
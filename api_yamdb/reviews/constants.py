@@ -12,3 +12,20 @@ ME_URL = 'me'
 EMAIL_ADMIN = 'admin@yamdb.ru'
 MIN_SCORE = 1
 MAX_SCORE = 10
+MAX_LENGTH_TRIGRAM_KIND = 20
+TRIGRAM_SIZE = 3
+MAX_EMBEDDED_COMMENTS = 10
+MAX_LENGTH_TOMBSTONE_KIND = 20
+SYNC_PAGE_SIZE = 100
+TOMBSTONE_RETENTION_DAYS = 30
+EXPORT_CHUNK_SIZE = 1000
+BULK_REVIEWS_MAX = 5000
+BULK_REVIEWS_BATCH_SIZE = 500
+MAX_LENGTH_EMAIL_SUBJECT = 255
+OUTBOX_BATCH_SIZE = 100
+OUTBOX_MAX_ATTEMPTS = 8
+OUTBOX_RETRY_DELAY = 30
+OUTBOX_MAX_RETRY_DELAY = 60 * 60
+OUTBOX_LEASE = 60 * 5
+OUTBOX_POLL_INTERVAL = 5
+TOKEN_CACHE_SIZE = 1024
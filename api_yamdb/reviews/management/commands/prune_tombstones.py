@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from reviews import constants
+from reviews.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = 'Delete tombstones older than the retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=constants.TOMBSTONE_RETENTION_DAYS,
+            help='Keep tombstones for this many days'
+        )
+
+    def handle(self, *args, days, **kwargs):
+        pruned = Tombstone.prune(timezone.now() - timedelta(days=days))
+        self.stdout.write(f'Pruned: {pruned}')
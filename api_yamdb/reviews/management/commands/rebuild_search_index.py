@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from reviews.search import (rebuild_title_index, rebuild_trigram_index,
+                            title_index_supported)
+from reviews.signals import TRIGRAM_MODELS
+
+
+class Command(BaseCommand):
+    help = 'Rebuild full-text and trigram search indexes'
+
+    def handle(self, *args, **kwargs):
+        if title_index_supported():
+            rebuild_title_index()
+        else:
+            self.stdout.write(self.style.WARNING(
+                'Full-text index is only available for SQLite'
+            ))
+        for model in TRIGRAM_MODELS:
+            rebuild_trigram_index(model)
+        self.stdout.write(self.style.SUCCESS('Search index rebuilt'))
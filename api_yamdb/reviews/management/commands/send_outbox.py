@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from reviews import constants
+from reviews.outbox import send_batch
+
+
+class Command(BaseCommand):
+    help = 'Send queued emails in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=constants.OUTBOX_BATCH_SIZE
+        )
+        parser.add_argument(
+            '--interval', type=float, default=constants.OUTBOX_POLL_INTERVAL,
+            help='Seconds to wait when the queue is empty'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit when the queue is drained'
+        )
+
+    def handle(self, *args, batch_size, interval, once, **kwargs):
+        while True:
+            try:
+                stats = send_batch(batch_size)
+            except Exception as error:
+                # Письма пачки вернутся в очередь по истечении аренды,
+                # а обработчик продолжает работать.
+                if once:
+                    raise
+                self.stderr.write(f'Batch failed: {error!r}')
+                time.sleep(interval)
+                continue
+            if stats.claimed:
+                self.stdout.write(
+                    'Batch: claimed={0.claimed} sent={0.sent} '
+                    'failed={0.failed} dead={0.dead} '
+                    'time={1:.0f}ms'.format(stats, stats.seconds * 1000)
+                )
+            if stats.claimed < batch_size:
+                if once:
+                    break
+                time.sleep(interval)
@@ -0,0 +1,55 @@
+from django.db import migrations, models
+
+from reviews.search import make_trigrams
+
+TRIGRAM_FIELDS = {
+    'category': 'name',
+    'genre': 'name',
+    'user': 'username',
+}
+
+
+def fill_trigrams(apps, schema_editor):
+    SearchTrigram = apps.get_model('reviews', 'SearchTrigram')
+    for kind, field in TRIGRAM_FIELDS.items():
+        model = apps.get_model('reviews', kind)
+        SearchTrigram.objects.bulk_create(
+            (
+                SearchTrigram(kind=kind, object_id=object_id, trigram=trigram)
+                for object_id, value in model.objects.values_list('pk', field)
+                for trigram in make_trigrams(value)
+            ),
+            batch_size=1000
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_title_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20, verbose_name='Тип объекта')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='ID объекта')),
+                ('trigram', models.CharField(max_length=3, verbose_name='Триграмма')),
+            ],
+            options={
+                'verbose_name': 'Триграмма',
+                'verbose_name_plural': 'Триграммы',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='searchtrigram',
+            index=models.Index(fields=['kind', 'object_id'], name='search_trigram_object_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='searchtrigram',
+            constraint=models.UniqueConstraint(fields=('kind', 'trigram', 'object_id'), name='unique_search_trigram'),
+        ),
+        migrations.RunPython(fill_trigrams, migrations.RunPython.noop),
+    ]
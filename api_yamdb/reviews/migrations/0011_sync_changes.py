@@ -0,0 +1,133 @@
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery
+
+from reviews.search import create_title_index
+
+
+def restore_title_index(apps, schema_editor):
+    # SQLite пересоздаёт таблицу произведений при добавлении поля,
+    # а вместе с ней теряются триггеры поискового индекса.
+    create_title_index(schema_editor)
+
+
+def fill_updated_at(apps, schema_editor):
+    for model_name in ('Review', 'Comment'):
+        apps.get_model('reviews', model_name).objects.update(
+            updated_at=F('pub_date')
+        )
+
+
+def fill_comment_title(apps, schema_editor):
+    Comment = apps.get_model('reviews', 'Comment')
+    Review = apps.get_model('reviews', 'Review')
+    Comment.objects.update(title_id=Subquery(
+        Review.objects.filter(pk=OuterRef('review_id')).values('title_id')[:1]
+    ))
+
+
+def fill_change_seq(apps, schema_editor):
+    # Существующие отзывы и комментарии нумеруются по дате публикации.
+    changes = defaultdict(list)
+    for model_name in ('Review', 'Comment'):
+        model = apps.get_model('reviews', model_name)
+        for pk, title_id, pub_date in model.objects.values_list(
+            'pk', 'title_id', 'pub_date'
+        ).iterator():
+            changes[title_id].append((pub_date, model_name, pk))
+
+    Title = apps.get_model('reviews', 'Title')
+    for title_id, title_changes in changes.items():
+        title_changes.sort()
+        for change_seq, (_, model_name, pk) in enumerate(
+            title_changes, 1
+        ):
+            apps.get_model('reviews', model_name).objects.filter(
+                pk=pk
+            ).update(change_seq=change_seq)
+        Title.objects.filter(pk=title_id).update(
+            change_seq=len(title_changes)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0010_review_comment_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('review', 'Отзыв'), ('comment', 'Комментарий')], max_length=20, verbose_name='Тип объекта')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='ID объекта')),
+                ('title_id', models.PositiveBigIntegerField(verbose_name='ID произведения')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Дата удаления')),
+                ('change_seq', models.PositiveBigIntegerField(default=0, verbose_name='Номер изменения')),
+            ],
+            options={
+                'verbose_name': 'Удалённый объект',
+                'verbose_name_plural': 'Удалённые объекты',
+            },
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='change_seq',
+            field=models.PositiveBigIntegerField(default=0, editable=False, verbose_name='Номер последнего изменения'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='pruned_seq',
+            field=models.PositiveBigIntegerField(default=0, editable=False, verbose_name='Номер последнего удалённого изменения'),
+        ),
+        migrations.RunPython(restore_title_index, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='comment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='change_seq',
+            field=models.PositiveBigIntegerField(default=0, editable=False, verbose_name='Номер изменения'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='change_seq',
+            field=models.PositiveBigIntegerField(default=0, editable=False, verbose_name='Номер изменения'),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='title',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='reviews.title', verbose_name='Произведение'),
+        ),
+        migrations.RunPython(fill_updated_at, migrations.RunPython.noop),
+        migrations.RunPython(fill_comment_title, migrations.RunPython.noop),
+        migrations.RunPython(fill_change_seq, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='comment',
+            name='title',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='reviews.title', verbose_name='Произведение'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['title', 'change_seq'], name='comment_title_change_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['title', 'change_seq'], name='review_title_change_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['title_id', 'change_seq'], name='tombstone_title_change_idx'),
+        ),
+    ]
@@ -1,7 +1,12 @@
+import threading
+
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import (MaxValueValidator, MinValueValidator,
                                     RegexValidator)
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Max
+from django.db.models.functions import Greatest
+from django.utils import timezone
 
 from reviews import constants
 from .validators import validate_username_contains_me, validate_year
@@ -47,6 +52,8 @@ class User(AbstractUser):
         verbose_name='Роль'
     )
 
+    trigram_field = 'username'
+
     class Meta:
         ordering = ['username']
         verbose_name = 'Пользователь'
@@ -65,9 +72,17 @@ class NameSlugModel(models.Model):
     name = models.CharField(max_length=constants.MAX_LENGTH_TITLE)
     slug = models.SlugField(unique=True)
 
+    trigram_field = 'name'
+
     class Meta:
         abstract = True
         ordering = ['name']
+        indexes = [
+            models.Index(
+                fields=['name'],
+                name='%(class)s_name_idx'
+            )
+        ]
 
     def __str__(self):
         return self.name[:constants.NUMBER_OF_CHAR]
@@ -108,7 +123,33 @@ class GenreTitle(models.Model):
         return f'{self.title[:constants.NUMBER_OF_CHAR]} - {self.genre}'
 
 
-class Title(models.Model):
+class CounterModel(models.Model):
+    """Модель со счётчиками, которые меняются только F-выражениями.
+
+    При сохранении существующей записи поля из `counter_fields` не
+    записываются: иначе экземпляр, загруженный до параллельного
+    изменения счётчика, затёр бы его старым значением.
+    """
+
+    counter_fields = ()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, update_fields=None, **kwargs):
+        refresh = update_fields is None and not self._state.adding
+        if refresh:
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.counter_fields
+            ]
+        super().save(*args, update_fields=update_fields, **kwargs)
+        if refresh:
+            self.refresh_from_db(fields=self.counter_fields)
+
+
+class Title(CounterModel):
     name = models.CharField(
         max_length=constants.MAX_LENGTH_TITLE,
         verbose_name='Название'
@@ -133,15 +174,87 @@ class Title(models.Model):
         related_name='titles',
         verbose_name='Категория'
     )
+    review_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество отзывов'
+    )
+    score_sum = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Сумма оценок'
+    )
+    change_seq = models.PositiveBigIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Номер последнего изменения'
+    )
+    pruned_seq = models.PositiveBigIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Номер последнего удалённого изменения'
+    )
+
+    counter_fields = ('review_count', 'score_sum', 'change_seq', 'pruned_seq')
+    # Произведения, которые удаляются в текущем потоке.
+    _deleting = threading.local()
 
     class Meta:
         ordering = ['name']
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            models.Index(
+                fields=['name', 'id'],
+                name='title_name_idx'
+            ),
+            models.Index(
+                fields=['category', 'year'],
+                name='title_category_year_idx'
+            ),
+            models.Index(
+                fields=['year'],
+                name='title_year_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name[:constants.NUMBER_OF_CHAR]
 
+    def delete(self, *args, **kwargs):
+        deleting = self._deleting.__dict__.setdefault('ids', set())
+        deleting.add(self.pk)
+        try:
+            return super().delete(*args, **kwargs)
+        finally:
+            deleting.discard(self.pk)
+
+    @classmethod
+    def is_deleting(cls, title_id):
+        """Удаляется ли произведение в этом потоке вместе с отзывами."""
+        return title_id in getattr(cls._deleting, 'ids', ())
+
+    @classmethod
+    def next_change_seq(cls, title_id, count=1):
+        """Выдаёт count номеров изменений произведения, возвращает последний.
+
+        Строка произведения остаётся заблокированной до конца транзакции,
+        поэтому изменения фиксируются в порядке номеров: запись с меньшим
+        номером не может появиться после записи с бо́льшим.
+        """
+        cls.objects.filter(pk=title_id).update(
+            change_seq=F('change_seq') + count
+        )
+        return cls.objects.filter(pk=title_id).values_list(
+            'change_seq', flat=True
+        ).order_by().first()
+
+    @property
+    def rating(self):
+        if not self.review_count:
+            return None
+        return self.score_sum / self.review_count
+
 
 class TextModel(models.Model):
     text = models.TextField(verbose_name='Текст')
@@ -155,13 +268,30 @@ class TextModel(models.Model):
         auto_now_add=True,
         db_index=True
     )
+    updated_at = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True
+    )
+    change_seq = models.PositiveBigIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Номер изменения'
+    )
 
     class Meta:
         abstract = True
         ordering = ('-pub_date',)
 
+    @staticmethod
+    def touched():
+        """Новое значение `updated_at` для update(): дата не идёт назад."""
+        return Greatest(
+            'updated_at',
+            models.Value(timezone.now(), output_field=models.DateTimeField())
+        )
 
-class Review(TextModel):
+
+class Review(CounterModel, TextModel):
     title = models.ForeignKey(
         Title,
         on_delete=models.CASCADE,
@@ -173,6 +303,15 @@ class Review(TextModel):
         validators=[MinValueValidator(constants.MIN_SCORE),
                     MaxValueValidator(constants.MAX_SCORE)]
     )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев'
+    )
+
+    # Дата изменения сдвигается и при добавлении комментариев, поэтому
+    # экземпляр, загруженный раньше, не должен записывать её обратно.
+    counter_fields = ('comment_count', 'updated_at')
 
     class Meta(TextModel.Meta):
         verbose_name = 'Отзыв'
@@ -183,10 +322,64 @@ class Review(TextModel):
                 name='unique_review'
             )
         ]
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date', '-id'],
+                name='review_title_pub_date_idx'
+            ),
+            models.Index(
+                fields=['title', 'change_seq'],
+                name='review_title_change_idx'
+            )
+        ]
 
     def __str__(self):
         return self.text[:constants.NUMBER_OF_CHAR]
 
+    def save(self, *args, update_fields=None, **kwargs):
+        # Счётчики произведения обновляются сигналами pre_save/post_save,
+        # поэтому они должны выполняться в одной транзакции с записью.
+        with transaction.atomic():
+            # Номер изменения выдаётся первым, чтобы строка произведения
+            # блокировалась раньше строки отзыва.
+            self.change_seq = Title.next_change_seq(self.title_id)
+            if not self._state.adding:
+                Review.objects.filter(pk=self.pk).update(
+                    updated_at=self.touched()
+                )
+            if update_fields is not None:
+                update_fields = {*update_fields, 'change_seq'}
+            super().save(*args, update_fields=update_fields, **kwargs)
+
+
+class ScoreCount(models.Model):
+    """Количество отзывов с данной оценкой у произведения."""
+
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='score_counts',
+        verbose_name='Произведение'
+    )
+    score = models.PositiveSmallIntegerField(verbose_name='Оценка')
+    count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество отзывов'
+    )
+
+    class Meta:
+        verbose_name = 'Количество оценок'
+        verbose_name_plural = 'Количество оценок'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['title', 'score'],
+                name='unique_score_count'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.title_id}: {self.score} - {self.count}'
+
 
 class Comment(TextModel):
     review = models.ForeignKey(
@@ -194,13 +387,178 @@ class Comment(TextModel):
         on_delete=models.CASCADE,
         verbose_name='Отзыв'
     )
+    # Копия review.title: изменения комментариев произведения читаются
+    # по индексу без соединения с отзывами.
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        editable=False,
+        verbose_name='Произведение'
+    )
 
     class Meta(TextModel.Meta):
         default_related_name = 'comments'
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date', '-id'],
+                name='comment_review_pub_date_idx'
+            ),
+            models.Index(
+                fields=['title', 'change_seq'],
+                name='comment_title_change_idx'
+            )
+        ]
 
     def __str__(self):
         return (f'{self.text[:constants.NUMBER_OF_CHAR]}, '
                 f'Отзыв: {self.review.text[:constants.NUMBER_OF_CHAR]}, '
                 f'Автор: {self.author}')
+
+    def save(self, *args, update_fields=None, **kwargs):
+        # Счётчик комментариев отзыва обновляется сигналом post_save.
+        with transaction.atomic():
+            if self.title_id is None:
+                self.title_id = self.review.title_id
+            self.change_seq = Title.next_change_seq(self.title_id)
+            if update_fields is not None:
+                update_fields = {*update_fields, 'change_seq'}
+            super().save(*args, update_fields=update_fields, **kwargs)
+
+
+class SearchTrigram(models.Model):
+    """Триграмма строкового поля для поиска по подстроке."""
+
+    kind = models.CharField(
+        max_length=constants.MAX_LENGTH_TRIGRAM_KIND,
+        verbose_name='Тип объекта'
+    )
+    object_id = models.PositiveBigIntegerField(verbose_name='ID объекта')
+    trigram = models.CharField(
+        max_length=constants.TRIGRAM_SIZE,
+        verbose_name='Триграмма'
+    )
+
+    class Meta:
+        verbose_name = 'Триграмма'
+        verbose_name_plural = 'Триграммы'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kind', 'trigram', 'object_id'],
+                name='unique_search_trigram'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['kind', 'object_id'],
+                name='search_trigram_object_idx'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.kind} {self.object_id}: {self.trigram}'
+
+
+class Tombstone(models.Model):
+    """Отметка об удалении отзыва или комментария для синхронизации."""
+
+    REVIEW = 'review'
+    COMMENT = 'comment'
+    KINDS = (
+        (REVIEW, 'Отзыв'),
+        (COMMENT, 'Комментарий'),
+    )
+
+    kind = models.CharField(
+        max_length=constants.MAX_LENGTH_TOMBSTONE_KIND,
+        choices=KINDS,
+        verbose_name='Тип объекта'
+    )
+    object_id = models.PositiveBigIntegerField(verbose_name='ID объекта')
+    # Произведение может быть удалено вместе с отзывами,
+    # поэтому хранится только его идентификатор.
+    title_id = models.PositiveBigIntegerField(verbose_name='ID произведения')
+    deleted_at = models.DateTimeField(
+        'Дата удаления',
+        auto_now_add=True,
+        db_index=True
+    )
+    change_seq = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Номер изменения'
+    )
+
+    class Meta:
+        verbose_name = 'Удалённый объект'
+        verbose_name_plural = 'Удалённые объекты'
+        indexes = [
+            models.Index(
+                fields=['title_id', 'change_seq'],
+                name='tombstone_title_change_idx'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.kind} {self.object_id}'
+
+    @classmethod
+    def prune(cls, before):
+        """Удаляет отметки, созданные раньше before, и возвращает их число.
+
+        Произведение запоминает номер последнего удалённого изменения:
+        клиент с более старым курсором мог пропустить удаление и должен
+        синхронизироваться заново.
+        """
+        with transaction.atomic():
+            expired = cls.objects.filter(deleted_at__lt=before)
+            for title_id, change_seq in expired.order_by().values_list(
+                'title_id'
+            ).annotate(Max('change_seq')):
+                Title.objects.filter(
+                    pk=title_id, pruned_seq__lt=change_seq
+                ).update(pruned_seq=change_seq)
+            return expired.delete()[0]
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку."""
+
+    subject = models.CharField(
+        max_length=constants.MAX_LENGTH_EMAIL_SUBJECT,
+        verbose_name='Тема'
+    )
+    body = models.TextField(verbose_name='Текст')
+    from_email = models.EmailField(
+        max_length=constants.MAX_LENGTH_EMAIL,
+        verbose_name='Отправитель'
+    )
+    recipient = models.EmailField(
+        max_length=constants.MAX_LENGTH_EMAIL,
+        verbose_name='Получатель'
+    )
+    created_at = models.DateTimeField('Дата создания', auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Количество попыток'
+    )
+    # Пустое значение означает, что попытки отправки исчерпаны.
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка',
+        null=True,
+        default=timezone.now
+    )
+    last_error = models.TextField(verbose_name='Последняя ошибка', blank=True)
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at', 'id'],
+                name='outgoing_email_next_idx'
+            )
+        ]
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
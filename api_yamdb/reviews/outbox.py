@@ -0,0 +1,119 @@
+import time
+from collections import namedtuple
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from reviews import constants
+from reviews.models import OutgoingEmail
+
+BatchStats = namedtuple(
+    'BatchStats', ('claimed', 'sent', 'failed', 'dead', 'seconds')
+)
+
+
+def enqueue_email(subject, body, recipient,
+                  from_email=constants.EMAIL_ADMIN):
+    """Ставит письмо в очередь в текущей транзакции."""
+    return OutgoingEmail.objects.create(
+        subject=subject,
+        body=body,
+        from_email=from_email,
+        recipient=recipient
+    )
+
+
+def get_retry_delay(attempts):
+    """Экспоненциальная задержка перед очередной попыткой, в секундах."""
+    return min(
+        constants.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1),
+        constants.OUTBOX_MAX_RETRY_DELAY
+    )
+
+
+def claim_batch(batch_size):
+    """Забирает пачку писем, откладывая их на время аренды.
+
+    Письма, которые упавший обработчик не успел отправить, вернутся
+    в очередь через OUTBOX_LEASE секунд, а параллельные обработчики
+    пропускают заблокированные строки.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutgoingEmail.objects.select_for_update(skip_locked=True)
+            .filter(next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'id')[:batch_size]
+        )
+        OutgoingEmail.objects.filter(
+            pk__in=[email.pk for email in emails]
+        ).update(
+            next_attempt_at=now + timedelta(seconds=constants.OUTBOX_LEASE)
+        )
+    return emails
+
+
+def send_emails(emails):
+    """Отправляет письма через одно соединение с почтовым сервером.
+
+    Возвращает id отправленных писем и пары (письмо, ошибка) для
+    остальных. Если соединение открыть не удалось, ошибкой считается
+    каждое письмо пачки.
+    """
+    sent, failed = [], []
+    try:
+        connection = get_connection()
+        connection.open()
+    except Exception as error:
+        return sent, [(email, error) for email in emails]
+    try:
+        for email in emails:
+            message = EmailMessage(
+                email.subject,
+                email.body,
+                email.from_email,
+                [email.recipient],
+                connection=connection
+            )
+            # Письма отправляются по одному, чтобы ошибка в одном
+            # не помешала отправить остальные.
+            try:
+                connection.send_messages([message])
+            except Exception as error:
+                failed.append((email, error))
+            else:
+                sent.append(email.pk)
+    finally:
+        try:
+            connection.close()
+        except Exception:
+            # Письма уже отправлены, ошибка при закрытии соединения
+            # не должна вернуть их в очередь.
+            pass
+    return sent, failed
+
+
+def send_batch(batch_size=constants.OUTBOX_BATCH_SIZE):
+    """Отправляет пачку писем и откладывает неотправленные."""
+    started = time.monotonic()
+    emails = claim_batch(batch_size)
+    sent, failed = send_emails(emails) if emails else ([], [])
+    OutgoingEmail.objects.filter(pk__in=sent).delete()
+    dead = 0
+    for email, error in failed:
+        email.attempts += 1
+        email.last_error = repr(error)
+        if email.attempts >= constants.OUTBOX_MAX_ATTEMPTS:
+            email.next_attempt_at = None
+            dead += 1
+        else:
+            email.next_attempt_at = timezone.now() + timedelta(
+                seconds=get_retry_delay(email.attempts)
+            )
+        email.save(update_fields=('attempts', 'last_error', 'next_attempt_at'))
+    return BatchStats(
+        len(emails), len(sent), len(failed), dead,
+        time.monotonic() - started
+    )
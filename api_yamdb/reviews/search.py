@@ -0,0 +1,181 @@
+"""Поисковые индексы.
+
+Полнотекстовый поиск по произведениям использует в SQLite внешний
+индекс FTS5 по полям `name` и `description`, который поддерживается
+триггерами на таблице произведений. Для других СУБД поиск сводится
+к `icontains`.
+
+Поиск по подстроке в категориях, жанрах и именах пользователей
+использует таблицу триграмм: кандидатами считаются объекты, у которых
+есть все триграммы искомой строки, и только они проверяются `icontains`.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Count, Q
+
+from reviews.constants import TRIGRAM_SIZE
+
+TITLE_INDEX = 'reviews_title_fts'
+# Вес совпадений в названии и в описании при ранжировании bm25.
+TITLE_INDEX_WEIGHTS = (10.0, 1.0)
+
+CREATE_TITLE_INDEX = (
+    f'''CREATE VIRTUAL TABLE IF NOT EXISTS {TITLE_INDEX} USING fts5(
+        name, description,
+        content='reviews_title', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )''',
+    f'''CREATE TRIGGER IF NOT EXISTS {TITLE_INDEX}_insert
+    AFTER INSERT ON reviews_title BEGIN
+        INSERT INTO {TITLE_INDEX}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END''',
+    f'''CREATE TRIGGER IF NOT EXISTS {TITLE_INDEX}_delete
+    AFTER DELETE ON reviews_title BEGIN
+        INSERT INTO {TITLE_INDEX}({TITLE_INDEX}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END''',
+    f'''CREATE TRIGGER IF NOT EXISTS {TITLE_INDEX}_update
+    AFTER UPDATE OF name, description ON reviews_title BEGIN
+        INSERT INTO {TITLE_INDEX}({TITLE_INDEX}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {TITLE_INDEX}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END''',
+)
+DROP_TITLE_INDEX = (
+    f'DROP TRIGGER IF EXISTS {TITLE_INDEX}_insert',
+    f'DROP TRIGGER IF EXISTS {TITLE_INDEX}_delete',
+    f'DROP TRIGGER IF EXISTS {TITLE_INDEX}_update',
+    f'DROP TABLE IF EXISTS {TITLE_INDEX}',
+)
+
+
+def title_index_supported(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def create_title_index(schema_editor):
+    if not title_index_supported(schema_editor.connection):
+        return
+    for statement in CREATE_TITLE_INDEX:
+        schema_editor.execute(statement)
+    schema_editor.execute(
+        f"INSERT INTO {TITLE_INDEX}({TITLE_INDEX}) VALUES ('rebuild')"
+    )
+
+
+def drop_title_index(schema_editor):
+    if not title_index_supported(schema_editor.connection):
+        return
+    for statement in DROP_TITLE_INDEX:
+        schema_editor.execute(statement)
+
+
+def rebuild_title_index():
+    """Пересоздаёт индекс и триггеры и заново индексирует произведения."""
+    with connection.schema_editor() as schema_editor:
+        drop_title_index(schema_editor)
+        create_title_index(schema_editor)
+
+
+def build_match_query(text):
+    """Превращает пользовательский ввод в безопасный запрос FTS5.
+
+    Каждое слово берётся в кавычки и ищется по префиксу, слова
+    объединяются через AND.
+    """
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', text))
+
+
+def search_titles(queryset, text):
+    match = build_match_query(text)
+    if not match:
+        return queryset.none()
+    if not title_index_supported():
+        words = re.findall(r'\w+', text)
+        condition = Q()
+        for word in words:
+            condition &= (
+                Q(name__icontains=word) | Q(description__icontains=word)
+            )
+        return queryset.filter(condition)
+    weights = ', '.join(str(weight) for weight in TITLE_INDEX_WEIGHTS)
+    return queryset.extra(
+        select={'search_rank': f'bm25({TITLE_INDEX}, {weights})'},
+        tables=[TITLE_INDEX],
+        where=[
+            f'{TITLE_INDEX}.rowid = reviews_title.id',
+            f'{TITLE_INDEX} MATCH %s',
+        ],
+        params=[match],
+    ).order_by('search_rank', 'name')
+
+
+def make_trigrams(text):
+    text = text.lower()
+    return {
+        text[start:start + TRIGRAM_SIZE]
+        for start in range(len(text) - TRIGRAM_SIZE + 1)
+    }
+
+
+def index_trigrams(instance):
+    """Обновляет триграммы объекта модели с атрибутом `trigram_field`."""
+    from reviews.models import SearchTrigram
+
+    kind = instance._meta.model_name
+    SearchTrigram.objects.filter(kind=kind, object_id=instance.pk).delete()
+    SearchTrigram.objects.bulk_create(
+        SearchTrigram(kind=kind, object_id=instance.pk, trigram=trigram)
+        for trigram in make_trigrams(
+            getattr(instance, instance.trigram_field)
+        )
+    )
+
+
+def delete_trigrams(instance):
+    from reviews.models import SearchTrigram
+
+    SearchTrigram.objects.filter(
+        kind=instance._meta.model_name, object_id=instance.pk
+    ).delete()
+
+
+def rebuild_trigram_index(model, batch_size=1000):
+    from reviews.models import SearchTrigram
+
+    kind = model._meta.model_name
+    SearchTrigram.objects.filter(kind=kind).delete()
+    rows = model.objects.values_list('pk', model.trigram_field).iterator()
+    batch = []
+    for object_id, value in rows:
+        batch.extend(
+            SearchTrigram(kind=kind, object_id=object_id, trigram=trigram)
+            for trigram in make_trigrams(value)
+        )
+        if len(batch) >= batch_size:
+            SearchTrigram.objects.bulk_create(batch)
+            batch = []
+    SearchTrigram.objects.bulk_create(batch)
+
+
+def trigram_candidates(model, text):
+    """Подзапрос с id объектов, содержащих все триграммы строки.
+
+    Возвращает None, если строка короче триграммы.
+    """
+    from reviews.models import SearchTrigram
+
+    trigrams = make_trigrams(text)
+    if not trigrams:
+        return None
+    return (
+        SearchTrigram.objects
+        .filter(kind=model._meta.model_name, trigram__in=trigrams)
+        .values('object_id')
+        .annotate(matched=Count('trigram'))
+        .filter(matched=len(trigrams))
+        .values('object_id')
+    )
@@ -0,0 +1,145 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from reviews.models import (Category, Comment, Genre, Review, ScoreCount,
+                            Title, Tombstone, User)
+from reviews.search import delete_trigrams, index_trigrams
+
+TRIGRAM_MODELS = (Category, Genre, User)
+
+
+def update_title_rating(title_id, count, score):
+    """Сдвигает счётчики рейтинга произведения на count отзывов и score."""
+    Title.objects.filter(pk=title_id).update(
+        review_count=F('review_count') + count,
+        score_sum=F('score_sum') + score
+    )
+
+
+def update_score_count(title_id, score, count):
+    """Сдвигает количество отзывов с оценкой score на count."""
+    updated = ScoreCount.objects.filter(
+        title_id=title_id, score=score
+    ).update(count=F('count') + count)
+    if updated or count <= 0:
+        return
+    try:
+        with transaction.atomic():
+            ScoreCount.objects.create(
+                title_id=title_id, score=score, count=count
+            )
+    except IntegrityError:
+        # Счётчик успел создать параллельный запрос.
+        ScoreCount.objects.filter(title_id=title_id, score=score).update(
+            count=F('count') + count
+        )
+
+
+def count_review(title_id, score, sign):
+    """Учитывает (sign=1) или исключает (sign=-1) оценку отзыва."""
+    update_title_rating(title_id, sign, sign * score)
+    update_score_count(title_id, score, sign)
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_score(sender, instance, raw, **kwargs):
+    instance._previous = None
+    if raw or instance._state.adding:
+        return
+    instance._previous = (
+        Review.objects.select_for_update()
+        .filter(pk=instance.pk)
+        .values('title_id', 'score')
+        .first()
+    )
+
+
+@receiver(post_save, sender=Review)
+def add_review_to_rating(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous', None)
+    if created:
+        count_review(instance.title_id, instance.score, 1)
+    elif previous is not None and (
+        previous['title_id'] != instance.title_id
+        or previous['score'] != instance.score
+    ):
+        count_review(previous['title_id'], previous['score'], -1)
+        count_review(instance.title_id, instance.score, 1)
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_from_rating(sender, instance, **kwargs):
+    count_review(instance.title_id, instance.score, -1)
+
+
+def update_comment_count(comment, count):
+    """Сдвигает счётчик комментариев отзыва на count."""
+    # Отзыв считается изменённым, чтобы новый счётчик попал в синхронизацию.
+    Review.objects.filter(pk=comment.review_id).update(
+        comment_count=F('comment_count') + count,
+        updated_at=Review.touched(),
+        change_seq=Title.next_change_seq(comment.title_id)
+    )
+
+
+@receiver(post_save, sender=Comment)
+def add_comment_to_count(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        update_comment_count(instance, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def remove_comment_from_count(sender, instance, **kwargs):
+    # Отзывы удаляемого произведения удаляются вместе с ним.
+    if not Title.is_deleting(instance.title_id):
+        update_comment_count(instance, -1)
+
+
+def bury(kind, object_id, title_id):
+    """Оставляет отметку об удалении для синхронизации."""
+    # Изменения удалённого произведения никто уже не прочитает.
+    if Title.is_deleting(title_id):
+        return
+    change_seq = Title.next_change_seq(title_id)
+    if change_seq is not None:
+        Tombstone.objects.create(
+            kind=kind,
+            object_id=object_id,
+            title_id=title_id,
+            change_seq=change_seq
+        )
+
+
+@receiver(post_delete, sender=Review)
+def bury_review(sender, instance, **kwargs):
+    bury(Tombstone.REVIEW, instance.pk, instance.title_id)
+
+
+@receiver(post_delete, sender=Comment)
+def bury_comment(sender, instance, **kwargs):
+    bury(Tombstone.COMMENT, instance.pk, instance.title_id)
+
+
+@receiver(post_delete, sender=Title)
+def remove_title_tombstones(sender, instance, **kwargs):
+    # Отметки, оставленные до удаления или при удалении через QuerySet.
+    Tombstone.objects.filter(title_id=instance.pk).delete()
+
+
+def update_trigrams(sender, instance, raw, update_fields, **kwargs):
+    if update_fields is not None and sender.trigram_field not in update_fields:
+        return
+    index_trigrams(instance)
+
+
+def remove_trigrams(sender, instance, **kwargs):
+    delete_trigrams(instance)
+
+
+for model in TRIGRAM_MODELS:
+    post_save.connect(update_trigrams, sender=model)
+    post_delete.connect(remove_trigrams, sender=model)
@@ -0,0 +1,48 @@
+import pytest
+from tests.utils import count_queries
+
+
+def create_catalog(size):
+    from reviews.models import Category, Genre, Title
+
+    category = Category.objects.create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+        for idx in range(3)
+    ]
+    for idx in range(size):
+        title = Title.objects.create(
+            name=f'Произведение {idx}', year=2000, category=category
+        )
+        title.genre.set(genres)
+    return Title.objects.order_by('name').first()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    LIST_QUERY_BUDGET = 3
+    DETAIL_QUERY_BUDGET = 2
+
+    @pytest.mark.parametrize('size', (1, 5, 10, 25))
+    def test_01_title_list_query_budget(self, client, size):
+        create_catalog(size)
+        _, queries = count_queries(client, self.TITLES_URL)
+        assert queries <= self.LIST_QUERY_BUDGET, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` выполняет не '
+            f'более {self.LIST_QUERY_BUDGET} SQL-запросов независимо от '
+            f'количества произведений на странице. Сейчас: {queries}.'
+        )
+
+    @pytest.mark.parametrize('size', (1, 25))
+    def test_02_title_detail_query_budget(self, client, size):
+        title = create_catalog(size)
+        url = self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title.id)
+        _, queries = count_queries(client, url)
+        assert queries <= self.DETAIL_QUERY_BUDGET, (
+            'Проверьте, что GET-запрос к '
+            f'`{self.TITLE_DETAIL_URL_TEMPLATE}` выполняет не более '
+            f'{self.DETAIL_QUERY_BUDGET} SQL-запросов. Сейчас: {queries}.'
+        )
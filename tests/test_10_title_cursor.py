@@ -0,0 +1,92 @@
+import json
+from base64 import urlsafe_b64encode
+from http import HTTPStatus
+
+import pytest
+
+
+def create_titles_with_duplicates(size):
+    from reviews.models import Category, Title
+
+    films = Category.objects.create(name='Фильм', slug='films')
+    books = Category.objects.create(name='Книги', slug='books')
+    for idx in range(size):
+        Title.objects.create(
+            name=f'Произведение {idx % 7}',
+            year=2000,
+            category=films if idx % 2 else books
+        )
+    return Title.objects.order_by('name', 'id')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10TitleCursorPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def walk(self, client, url):
+        ids = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+                'статусом 200.'
+            )
+            data = response.json()
+            assert 'count' not in data, (
+                'Проверьте, что при пагинации по курсору не выполняется '
+                'подсчёт общего количества объектов.'
+            )
+            ids.extend(title['id'] for title in data['results'])
+            url = data['next']
+        return ids
+
+    def test_01_cursor_walks_whole_catalog(self, client):
+        titles = create_titles_with_duplicates(33)
+        ids = self.walk(client, f'{self.TITLES_URL}?cursor=')
+        assert ids == [title.id for title in titles], (
+            'Проверьте, что пагинация по курсору возвращает все произведения '
+            'ровно один раз в порядке (`name`, `id`).'
+        )
+
+    def test_02_cursor_with_filter(self, client):
+        titles = create_titles_with_duplicates(33)
+        ids = self.walk(client, f'{self.TITLES_URL}?category=films&cursor=')
+        assert ids == [
+            title.id for title in titles if title.category.slug == 'films'
+        ], (
+            'Проверьте, что пагинация по курсору учитывает фильтры '
+            f'`{self.TITLES_URL}`.'
+        )
+
+    def test_03_cursor_previous_page(self, client):
+        titles = list(create_titles_with_duplicates(25))
+        first = client.get(f'{self.TITLES_URL}?cursor=').json()
+        assert first['previous'] is None
+        second = client.get(first['next']).json()
+        previous = client.get(second['previous']).json()
+        assert [title['id'] for title in previous['results']] == [
+            title.id for title in titles[:10]
+        ], (
+            'Проверьте, что ссылка `previous` при пагинации по курсору ведёт '
+            'на предыдущую страницу.'
+        )
+
+    def test_04_invalid_cursor(self, client):
+        response = client.get(f'{self.TITLES_URL}?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что при некорректном курсоре возвращается ответ со '
+            'статусом 404.'
+        )
+
+    def test_05_invalid_cursor_values(self, client):
+        create_titles_with_duplicates(3)
+        for values in (['a', 'zz'], ['a', None], [None, 1], ['a', 2 ** 70]):
+            cursor = urlsafe_b64encode(
+                json.dumps({'p': values, 'r': 0}).encode()
+            ).decode()
+            response = client.get(f'{self.TITLES_URL}?cursor={cursor}')
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                'Проверьте, что курсор со значениями неверного типа '
+                f'{values} возвращает ответ со статусом 404.'
+            )
@@ -0,0 +1,80 @@
+from http import HTTPStatus
+
+import pytest
+from tests.utils import capture_queries
+
+
+def create_genres(size):
+    from reviews.models import Genre
+
+    Genre.objects.bulk_create(
+        Genre(name=f'Жанр {idx}', slug=f'genre-{idx}') for idx in range(size)
+    )
+
+
+def count_queries_made(client, url):
+    response, queries = capture_queries(client.get, url)
+    assert response.status_code == HTTPStatus.OK
+    return response.json(), [
+        query for query in queries if 'COUNT(' in query.upper()
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11PaginationCount:
+
+    GENRES_URL = '/api/v1/genres/'
+
+    def test_01_count_is_cached(self, client, admin_client):
+        create_genres(15)
+        data, counts = count_queries_made(client, self.GENRES_URL)
+        assert data['count'] == 15
+        assert len(counts) == 1
+
+        data, counts = count_queries_made(client, f'{self.GENRES_URL}?page=2')
+        assert data['count'] == 15
+        assert not counts, (
+            'Проверьте, что количество объектов кешируется между страницами '
+            f'`{self.GENRES_URL}`.'
+        )
+
+        data, counts = count_queries_made(
+            client, f'{self.GENRES_URL}?search=1'
+        )
+        assert len(counts) == 1, (
+            'Проверьте, что количество объектов кешируется отдельно для '
+            'каждого набора фильтров.'
+        )
+
+        response = admin_client.post(
+            self.GENRES_URL, data={'name': 'Новый', 'slug': 'new'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        data, counts = count_queries_made(client, self.GENRES_URL)
+        assert data['count'] == 16, (
+            'Проверьте, что кешированное количество объектов сбрасывается '
+            'после изменения данных.'
+        )
+
+    def test_02_count_can_be_skipped(self, client):
+        create_genres(15)
+        data, counts = count_queries_made(
+            client, f'{self.GENRES_URL}?count=false'
+        )
+        assert not counts, (
+            'Проверьте, что параметр `count=false` отключает подсчёт '
+            'количества объектов.'
+        )
+        assert data['count'] is None
+        assert len(data['results']) == 10
+        assert data['previous'] is None
+        assert data['next']
+
+        data, counts = count_queries_made(client, data['next'])
+        assert not counts
+        assert len(data['results']) == 5
+        assert data['next'] is None
+        assert data['previous']
+
+        response = client.get(f'{self.GENRES_URL}?count=false&page=5')
+        assert response.status_code == HTTPStatus.NOT_FOUND
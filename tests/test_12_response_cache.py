@@ -0,0 +1,73 @@
+from http import HTTPStatus
+
+import pytest
+from django.conf import settings
+from django.test import override_settings
+from tests.utils import count_queries, create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12ResponseCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    GENRES_URL = '/api/v1/genres/'
+
+    def check_cached_and_invalidated(self, client, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        detail_url = self.TITLE_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+        for url in (self.TITLES_URL, f'{self.TITLES_URL}?genre=horror',
+                    detail_url, self.GENRES_URL):
+            first, _ = count_queries(client, url)
+            second, queries = count_queries(client, url)
+            assert second == first
+            assert queries == 0, (
+                'Проверьте, что повторный GET-запрос анонимного пользователя '
+                f'к `{url}` обслуживается из кеша без обращений к базе.'
+            )
+
+        create_single_review(user_client, titles[0]['id'], 'Отлично', 9)
+        data, queries = count_queries(client, detail_url)
+        assert queries > 0
+        assert data['rating'] == 9, (
+            'Проверьте, что кеш ответов сбрасывается после добавления отзыва '
+            'к произведению.'
+        )
+
+        response = admin_client.post(
+            self.GENRES_URL, data={'name': 'Вестерн', 'slug': 'western'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        data, _ = count_queries(client, self.GENRES_URL)
+        assert data['count'] == 4, (
+            'Проверьте, что кеш ответов сбрасывается после добавления жанра.'
+        )
+
+    def test_01_locmem_cache(self, client, admin_client, user_client):
+        self.check_cached_and_invalidated(client, admin_client, user_client)
+
+    def test_02_file_based_cache(self, client, admin_client, user_client,
+                                 tmp_path):
+        caches = {
+            **settings.CACHES,
+            'default': {
+                'BACKEND':
+                    'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': str(tmp_path),
+            }
+        }
+        with override_settings(CACHES=caches):
+            self.check_cached_and_invalidated(
+                client, admin_client, user_client
+            )
+
+    def test_03_authenticated_requests_bypass_cache(self, client,
+                                                    admin_client):
+        create_titles(admin_client)
+        count_queries(client, self.TITLES_URL)
+        _, queries = count_queries(admin_client, self.TITLES_URL)
+        assert queries > 0, (
+            'Проверьте, что кешируются только ответы анонимным пользователям.'
+        )
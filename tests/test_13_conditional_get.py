@@ -0,0 +1,170 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from tests.utils import create_comments, create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ConditionalGet:
+
+    def check_not_modified(self, client, url):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        etag = response.get('ETag')
+        assert etag and response.get('Last-Modified'), (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовки `ETag` и `Last-Modified`.'
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+        assert not response.content
+        assert not [
+            query for query in context.captured_queries
+            if 'reviews_user' not in query['sql']
+        ], (
+            'Проверьте, что ответ 304 формируется без выборки данных.'
+        )
+        response = client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+        return etag
+
+    def test_01_read_endpoints_support_etag(self, client, admin, admin_client,
+                                            user, user_client, moderator,
+                                            moderator_client):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        urls = (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{title_id}/',
+            '/api/v1/categories/',
+            '/api/v1/genres/',
+            f'/api/v1/titles/{title_id}/reviews/',
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/',
+            f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+            (f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+             f'{comments[0]["id"]}/'),
+        )
+        for url in urls:
+            self.check_not_modified(client, url)
+            self.check_not_modified(user_client, url)
+
+    def test_02_etag_changes_after_write(self, client, admin_client,
+                                         user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        etag = self.check_not_modified(client, url)
+        create_single_review(user_client, titles[0]['id'], 'Хорошо', 8)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что `ETag` меняется после изменения данных.'
+        )
+        assert response.json()['count'] == 1
+
+    def test_03_title_etag_scoped_to_title(self, client, admin_client,
+                                           user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_url = '/api/v1/titles/{}/'
+        urls = (
+            title_url.format(titles[0]['id']),
+            title_url.format(titles[0]['id']) + 'rating-distribution/',
+        )
+        etags = {url: self.check_not_modified(client, url) for url in urls}
+        create_single_review(user_client, titles[1]['id'], 'Хорошо', 8)
+        for url in urls:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что отзыв к другому произведению не меняет '
+                f'`ETag` ответа на GET-запрос к `{url}`.'
+            )
+
+        create_single_review(user_client, titles[0]['id'], 'Хорошо', 8)
+        for url in urls:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что отзыв к произведению меняет `ETag` ответа '
+                f'на GET-запрос к `{url}`.'
+            )
+        assert client.get(urls[0]).json()['rating'] == 8
+
+        etag = self.check_not_modified(client, urls[0])
+        admin_client.patch(urls[0], data={'name': 'Новое название'})
+        response = client.get(urls[0], HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['name'] == 'Новое название'
+
+    def test_04_review_etags_scoped_to_parent(self, client, admin, user,
+                                              admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        review_id = create_single_review(
+            user_client, titles[0]['id'], 'Хорошо', 8
+        ).json()['id']
+        reviews_url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        comments_url = f'{reviews_url}{review_id}/comments/'
+        urls = (reviews_url, comments_url)
+        etags = {url: self.check_not_modified(client, url) for url in urls}
+
+        create_single_review(user_client, titles[1]['id'], 'Хорошо', 8)
+        admin.bio = 'Новое описание'
+        admin.save()
+        for url in urls:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что `ETag` ответа на GET-запрос к `{url}` не '
+                'меняется при записи в другие произведения и пользователей.'
+            )
+
+        user_client.post(comments_url, data={'text': 'Комментарий'})
+        for url in urls:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что комментарий меняет `ETag` ответа на '
+                f'GET-запрос к `{url}`.'
+            )
+            etags[url] = response['ETag']
+
+        user.username = 'renamed'
+        user.save()
+        for url in urls:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что смена имени автора меняет `ETag` ответа на '
+                f'GET-запрос к `{url}`.'
+            )
+            assert response.json()['results'][0]['author'] == 'renamed'
+
+    def test_05_versions_shared_between_processes(self, client, admin_client):
+        import time
+
+        from django.conf import settings
+        from django.core.cache import caches
+
+        from api.cache import REVIEWS_SCOPE, VERSION_KEY
+
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        etag = self.check_not_modified(client, url)
+        # Запись в другом процессе меняет версию в общем кеше.
+        other = caches.create_connection(settings.SHARED_CACHE_ALIAS)
+        other.set(
+            VERSION_KEY.format(REVIEWS_SCOPE.format(titles[0]['id'])),
+            time.time_ns(), None
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что версии данных хранятся в общем для всех '
+            'процессов кеше и `ETag` меняется после записи в другом '
+            'процессе.'
+        )
@@ -0,0 +1,73 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+
+def create_titles_for_search():
+    from reviews.models import Title
+
+    return {
+        'terminator': Title.objects.create(
+            name='Терминатор', year=1984,
+            description='Киборг из будущего отправлен в прошлое'
+        ),
+        'matrix': Title.objects.create(
+            name='Матрица', year=1999,
+            description='Хакер узнаёт правду о мире и терминаторах машин'
+        ),
+        'alien': Title.objects.create(
+            name='Чужой', year=1979,
+            description='Экипаж космического корабля встречает пришельца'
+        ),
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def search(self, client, text):
+        response = client.get(self.TITLES_URL, {'search': text})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` с параметром '
+            '`search` возвращает ответ со статусом 200.'
+        )
+        return [title['id'] for title in response.json()['results']]
+
+    def test_01_search_by_words_ranked(self, client):
+        titles = create_titles_for_search()
+        assert self.search(client, 'терминатор') == [
+            titles['terminator'].id, titles['matrix'].id
+        ], (
+            'Проверьте, что поиск находит произведения по словам из '
+            'названия и описания, а совпадения в названии идут первыми.'
+        )
+        assert self.search(client, 'космического корабля') == [
+            titles['alien'].id
+        ]
+        assert self.search(client, 'корабль хакер') == []
+        assert self.search(client, '"*)(') == []
+
+    def test_02_index_follows_title_writes(self, client):
+        from reviews.models import Title
+
+        titles = create_titles_for_search()
+        Title.objects.filter(pk=titles['alien'].pk).update(
+            description='Рипли против ксеноморфа'
+        )
+        assert self.search(client, 'ксеноморф') == [titles['alien'].id]
+        assert self.search(client, 'пришельца') == []
+        titles['matrix'].delete()
+        assert self.search(client, 'терминатор') == [
+            titles['terminator'].id
+        ]
+
+    def test_03_rebuild_command(self, client):
+        titles = create_titles_for_search()
+        call_command('rebuild_search_index')
+        assert self.search(client, 'чужой') == [titles['alien'].id], (
+            'Проверьте, что команда `rebuild_search_index` пересоздаёт '
+            'поисковый индекс.'
+        )
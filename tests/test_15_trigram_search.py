@@ -0,0 +1,72 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15TrigramSearch:
+
+    GENRES_URL = '/api/v1/genres/'
+    USERS_URL = '/api/v1/users/'
+
+    def search(self, client, url, text):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, {'search': text})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{url}` с параметром `search` '
+            'возвращает ответ со статусом 200.'
+        )
+        return response.json()['results'], context.captured_queries
+
+    def test_01_genre_search(self, client, admin_client):
+        for name, slug in (('Научная фантастика', 'sci-fi'),
+                           ('Фэнтези', 'fantasy'),
+                           ('Драма', 'drama')):
+            admin_client.post(
+                self.GENRES_URL, data={'name': name, 'slug': slug}
+            )
+        results, queries = self.search(client, self.GENRES_URL, 'фант')
+        assert [genre['slug'] for genre in results] == ['sci-fi'], (
+            'Проверьте, что поиск по жанрам находит подстроку в названии.'
+        )
+        assert any('reviews_searchtrigram' in query['sql']
+                   for query in queries), (
+            'Проверьте, что поиск по подстроке использует индекс триграмм.'
+        )
+        results, _ = self.search(client, self.GENRES_URL, 'ма')
+        assert [genre['slug'] for genre in results] == ['drama'], (
+            'Проверьте, что поиск по строкам короче трёх символов '
+            'продолжает работать.'
+        )
+
+    def test_02_index_follows_writes(self, client, admin_client):
+        from reviews.models import Genre, SearchTrigram
+
+        genre = Genre.objects.create(name='Детектив', slug='detective')
+        genre.name = 'Вестерн'
+        genre.save()
+        results, _ = self.search(client, self.GENRES_URL, 'Детект')
+        assert results == []
+        results, _ = self.search(client, self.GENRES_URL, 'Вест')
+        assert [genre['slug'] for genre in results] == ['detective']
+
+        response = admin_client.delete(f'{self.GENRES_URL}detective/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert not SearchTrigram.objects.filter(
+            kind='genre', object_id=genre.id
+        ).exists(), (
+            'Проверьте, что триграммы удаляются вместе с объектом.'
+        )
+
+    def test_03_user_search(self, admin_client, admin, user, moderator):
+        results, _ = self.search(admin_client, self.USERS_URL, 'moder')
+        assert [item['username'] for item in results] == [
+            moderator.username
+        ]
+        results, _ = self.search(admin_client, self.USERS_URL, 'test use')
+        assert [item['username'] for item in results] == [user.username], (
+            'Проверьте, что при поиске по нескольким словам возвращаются '
+            'объекты, содержащие их все.'
+        )
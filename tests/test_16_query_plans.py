@@ -0,0 +1,79 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from tests.utils import create_comments
+
+FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?\w+$')
+
+ENDPOINTS = (
+    '/api/v1/titles/',
+    '/api/v1/titles/?genre=horror',
+    '/api/v1/titles/?category=films',
+    '/api/v1/titles/?category=films&year=1984',
+    '/api/v1/titles/?year=1984',
+    '/api/v1/titles/?cursor=',
+    '/api/v1/titles/?search=back',
+    '/api/v1/titles/{title_id}/',
+    '/api/v1/categories/',
+    '/api/v1/categories/?search=Фил',
+    '/api/v1/genres/',
+    '/api/v1/genres/?search=Ужа',
+    '/api/v1/titles/{title_id}/reviews/',
+    '/api/v1/titles/{title_id}/reviews/?cursor=',
+    '/api/v1/titles/{title_id}/reviews/?comments=3',
+    '/api/v1/titles/{title_id}/reviews/changes/',
+    '/api/v1/titles/{title_id}/reviews/{review_id}/',
+    '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+    '/api/v1/titles/{title_id}/reviews/{review_id}/comments/?cursor=',
+    '/api/v1/titles/{title_id}/reviews/{review_id}/comments/{comment_id}/',
+    '/api/v1/users/',
+    '/api/v1/users/?search=Test',
+    '/api/v1/users/{username}/',
+)
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16QueryPlans:
+
+    @pytest.mark.parametrize('url_template', ENDPOINTS)
+    def test_01_no_full_scans(self, url_template, admin, admin_client, user,
+                              user_client, moderator, moderator_client):
+        if connection.vendor != 'sqlite':
+            pytest.skip('EXPLAIN QUERY PLAN поддерживается только SQLite.')
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        comments, reviews, titles = create_comments(admin_client, author_map)
+        url = url_template.format(
+            title_id=titles[0]['id'],
+            review_id=reviews[0]['id'],
+            comment_id=comments[0]['id'],
+            username=user.username
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+
+        for query in context.captured_queries:
+            if not query['sql'].startswith('SELECT'):
+                continue
+            scans = [
+                step for step in explain(query['sql'])
+                if FULL_SCAN.match(step)
+            ]
+            assert not scans, (
+                f'Проверьте индексы для GET-запроса к `{url_template}`: '
+                f'запрос `{query["sql"]}` выполняет полный просмотр '
+                f'таблицы ({", ".join(scans)}).'
+            )
@@ -0,0 +1,66 @@
+from http import HTTPStatus
+
+import pytest
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17TitleFilters:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def filter_titles(self, client, params):
+        response = client.get(self.TITLES_URL, params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` с параметрами '
+            f'{params} возвращает ответ со статусом 200.'
+        )
+        data = response.json()
+        names = [title['name'] for title in data['results']]
+        assert data['count'] == len(names)
+        return names
+
+    def test_01_multi_value_genre(self, client, admin_client):
+        create_titles(admin_client)
+        assert self.filter_titles(client, {'genre': 'horror,comedy'}) == [
+            'Терминатор'
+        ], (
+            'Проверьте, что произведение с несколькими подходящими жанрами '
+            'возвращается один раз.'
+        )
+        assert self.filter_titles(client, {'genre': 'horror,drama'}) == [
+            'Крепкий орешек', 'Терминатор'
+        ], (
+            'Проверьте, что фильтр `genre` с несколькими значениями '
+            'возвращает произведения с любым из жанров.'
+        )
+        assert self.filter_titles(
+            client, {'genre': 'horror,comedy', 'genre_match': 'all'}
+        ) == ['Терминатор']
+        assert self.filter_titles(
+            client, {'genre': 'horror,drama', 'genre_match': 'all'}
+        ) == [], (
+            'Проверьте, что при `genre_match=all` возвращаются только '
+            'произведения со всеми указанными жанрами.'
+        )
+        response = client.get(self.TITLES_URL, {'genre_match': 'some'})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_02_multi_value_category_and_year_range(self, client,
+                                                    admin_client):
+        create_titles(admin_client)
+        assert self.filter_titles(client, {'category': 'films,books'}) == [
+            'Крепкий орешек', 'Терминатор'
+        ]
+        assert self.filter_titles(client, {'category': 'books'}) == [
+            'Крепкий орешек'
+        ]
+        assert self.filter_titles(
+            client, {'year_min': 1985, 'year_max': 1990}
+        ) == ['Крепкий орешек'], (
+            'Проверьте, что фильтры `year_min` и `year_max` ограничивают '
+            'год выпуска произведения.'
+        )
+        assert self.filter_titles(client, {'year_max': 1984}) == [
+            'Терминатор'
+        ]
@@ -0,0 +1,89 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from tests.utils import create_reviews, create_titles
+
+
+def count_parent_selects(table, queries):
+    # Считаются только загрузки объекта целиком, а не чтение отдельных
+    # полей вроде счётчика номеров изменений.
+    return len([
+        query for query in queries
+        if query['sql'].startswith(f'SELECT "{table}"."id"')
+        and f'FROM "{table}"' in query['sql']
+    ])
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18ParentQueries:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def test_01_review_title_loaded_once(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Ok', 'score': 5})
+        assert response.status_code == HTTPStatus.CREATED
+        assert count_parent_selects(
+            'reviews_title', context.captured_queries
+        ) == 1, (
+            f'Проверьте, что при POST-запросе к `{self.REVIEWS_URL_TEMPLATE}` '
+            'произведение загружается из базы один раз.'
+        )
+
+        url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=response.json()['id']
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.patch(url, data={'score': 7})
+        assert response.status_code == HTTPStatus.OK
+        assert count_parent_selects(
+            'reviews_title', context.captured_queries
+        ) == 1, (
+            'Проверьте, что при PATCH-запросе к '
+            f'`{self.REVIEW_DETAIL_URL_TEMPLATE}` произведение загружается '
+            'из базы один раз.'
+        )
+
+    def test_02_comment_review_loaded_once(self, admin, admin_client, user,
+                                           user_client):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        for client, method, data in (
+            (user_client, 'post', {'text': 'Согласен'}),
+            (user_client, 'get', None),
+        ):
+            with CaptureQueriesContext(connection) as context:
+                response = getattr(client, method)(url, data=data)
+            assert response.status_code in (HTTPStatus.OK,
+                                             HTTPStatus.CREATED)
+            assert count_parent_selects(
+                'reviews_review', context.captured_queries
+            ) == 1, (
+                f'Проверьте, что при {method.upper()}-запросе к '
+                f'`{self.COMMENTS_URL_TEMPLATE}` отзыв загружается из базы '
+                'один раз.'
+            )
+
+    def test_03_missing_parent(self, user_client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=100500
+        )
+        assert user_client.get(url).status_code == HTTPStatus.NOT_FOUND
+        assert user_client.post(
+            url, data={'text': 'Нет'}
+        ).status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,96 @@
+import threading
+from http import HTTPStatus
+
+import pytest
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19ReviewUniqueness:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    PARALLEL_REQUESTS = 8
+
+    def test_01_duplicate_review_without_precheck(self, admin_client,
+                                                  user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        response = user_client.post(url, data={'text': 'Ok', 'score': 5})
+        assert response.status_code == HTTPStatus.CREATED
+
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Ok', 'score': 6})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что при попытке пользователя создать второй отзыв на '
+            f'одно и то же произведение POST-запрос к `{url}` вернёт ответ '
+            'со статусом 400.'
+        )
+        assert 'non_field_errors' in response.json()
+        assert not [
+            query for query in context.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_review"' in query['sql']
+        ], (
+            'Проверьте, что дубликат отзыва определяется ограничением '
+            'базы данных, а не предварительным запросом.'
+        )
+
+    def test_02_parallel_reviews_from_one_author(self, admin_client,
+                                                 token_user):
+        from reviews.models import Review, Title
+
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        barrier = threading.Barrier(self.PARALLEL_REQUESTS)
+        statuses = []
+
+        def post_review(score):
+            client = APIClient()
+            client.credentials(
+                HTTP_AUTHORIZATION=f'Bearer {token_user["access"]}'
+            )
+            try:
+                barrier.wait()
+                response = client.post(
+                    url, data={'text': 'Параллельно', 'score': score}
+                )
+                statuses.append(response.status_code)
+            finally:
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=post_review, args=(score,))
+            for score in range(1, self.PARALLEL_REQUESTS + 1)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(statuses) == [HTTPStatus.CREATED] + [
+            HTTPStatus.BAD_REQUEST
+        ] * (self.PARALLEL_REQUESTS - 1), (
+            'Проверьте, что из параллельных POST-запросов одного автора к '
+            f'`{self.REVIEWS_URL_TEMPLATE}` успешен ровно один, а остальные '
+            f'получают ответ со статусом 400. Получено: {statuses}.'
+        )
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert Review.objects.filter(title=title).count() == 1
+        assert title.review_count == 1
+
+    def test_03_other_integrity_errors_not_masked(self, admin_client,
+                                                  user_client, monkeypatch):
+        from django.db import IntegrityError
+        from reviews.models import Review
+
+        def fail(*args, **kwargs):
+            raise IntegrityError('FOREIGN KEY constraint failed')
+
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        monkeypatch.setattr(Review, 'save', fail)
+        with pytest.raises(IntegrityError):
+            user_client.post(url, data={'text': 'Ok', 'score': 5})
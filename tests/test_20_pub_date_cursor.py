@@ -0,0 +1,79 @@
+import json
+from base64 import urlsafe_b64encode
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+from tests.utils import create_reviews_with_comments
+
+
+def create_reviews_with_shared_dates(size):
+    from reviews.models import Comment, Review
+
+    title, review = create_reviews_with_comments(size)
+    # Одинаковые даты проверяют, что курсор различает записи по id.
+    moment = timezone.now()
+    for model in (Review, Comment):
+        ids = model.objects.order_by('id').values_list('id', flat=True)
+        model.objects.filter(id__in=list(ids)[::2]).update(pub_date=moment)
+    return title, review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20PubDateCursorPagination:
+
+    def walk(self, client, url):
+        ids = []
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            ids.extend(item['id'] for item in data['results'])
+            url = data['next']
+        return ids
+
+    def test_01_reviews_cursor(self, client):
+        from reviews.models import Review
+
+        title, _ = create_reviews_with_shared_dates(23)
+        ids = self.walk(client, f'/api/v1/titles/{title.id}/reviews/?cursor=')
+        assert ids == list(
+            Review.objects.filter(title=title)
+            .order_by('-pub_date', '-id').values_list('id', flat=True)
+        ), (
+            'Проверьте, что пагинация отзывов по курсору возвращает все '
+            'отзывы ровно один раз в порядке (`-pub_date`, `-id`).'
+        )
+
+    def test_02_comments_cursor(self, client):
+        from reviews.models import Comment
+
+        title, review = create_reviews_with_shared_dates(23)
+        ids = self.walk(
+            client,
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/?cursor='
+        )
+        assert ids == list(
+            Comment.objects.filter(review=review)
+            .order_by('-pub_date', '-id').values_list('id', flat=True)
+        ), (
+            'Проверьте, что пагинация комментариев по курсору возвращает '
+            'все комментарии ровно один раз в порядке (`-pub_date`, `-id`).'
+        )
+
+    def test_03_invalid_cursor_values(self, client):
+        title, review = create_reviews_with_shared_dates(3)
+        urls = (
+            f'/api/v1/titles/{title.id}/reviews/',
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+        )
+        for url in urls:
+            for values in (['garbage', 'zz'], [1, 2], [None, 1]):
+                cursor = urlsafe_b64encode(
+                    json.dumps({'p': values, 'r': 0}).encode()
+                ).decode()
+                response = client.get(f'{url}?cursor={cursor}')
+                assert response.status_code == HTTPStatus.NOT_FOUND, (
+                    f'Проверьте, что GET-запрос к `{url}` с курсором '
+                    f'{values} возвращает ответ со статусом 404.'
+                )
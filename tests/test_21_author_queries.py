@@ -0,0 +1,39 @@
+from http import HTTPStatus
+
+import pytest
+from tests.utils import count_queries, create_reviews_with_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21AuthorQueries:
+
+    QUERY_BUDGET = 3
+    DETAIL_QUERY_BUDGET = 2
+
+    @pytest.mark.parametrize('size', (1, 5, 10, 25))
+    def test_01_review_and_comment_lists(self, client, size):
+        title, review = create_reviews_with_comments(size)
+        for url in (
+            f'/api/v1/titles/{title.id}/reviews/',
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/',
+        ):
+            _, queries = count_queries(client, url)
+            assert queries <= self.QUERY_BUDGET, (
+                f'Проверьте, что GET-запрос к `{url}` загружает авторов '
+                f'в том же запросе и выполняет не более {self.QUERY_BUDGET} '
+                f'SQL-запросов. Сейчас: {queries}.'
+            )
+
+    def test_02_review_and_comment_detail(self, client):
+        title, review = create_reviews_with_comments(3)
+        comment = review.comments.first()
+        for url in (
+            f'/api/v1/titles/{title.id}/reviews/{review.id}/',
+            (f'/api/v1/titles/{title.id}/reviews/{review.id}/comments/'
+             f'{comment.id}/'),
+        ):
+            _, queries = count_queries(client, url)
+            assert queries <= self.DETAIL_QUERY_BUDGET, (
+                f'Проверьте, что GET-запрос к `{url}` выполняет не более '
+                f'{self.DETAIL_QUERY_BUDGET} SQL-запросов. Сейчас: {queries}.'
+            )
@@ -0,0 +1,70 @@
+from http import HTTPStatus
+
+import pytest
+from tests.utils import capture_queries, create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22RatingDistribution:
+
+    URL_TEMPLATE = '/api/v1/titles/{title_id}/rating-distribution/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_distribution(self, client, title_id):
+        url = self.URL_TEMPLATE.format(title_id=title_id)
+        response, queries = capture_queries(client.get, url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.URL_TEMPLATE}` возвращает '
+            'ответ со статусом 200.'
+        )
+        assert not [
+            query for query in queries if 'reviews_review' in query
+        ], (
+            'Проверьте, что распределение оценок берётся из счётчиков, '
+            'а не вычисляется по таблице отзывов.'
+        )
+        return {item['score']: item['count'] for item in response.json()}
+
+    def test_01_distribution_follows_reviews(self, client, admin_client,
+                                             user_client, moderator_client,
+                                             moderator):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        expected = dict.fromkeys(range(1, 11), 0)
+        assert self.get_distribution(client, title_id) == expected, (
+            'Проверьте, что распределение содержит все оценки от 1 до 10.'
+        )
+
+        create_single_review(admin_client, title_id, 'Отлично', 10)
+        review = create_single_review(user_client, title_id, 'Хорошо', 8)
+        create_single_review(moderator_client, title_id, 'Отлично', 10)
+        expected.update({10: 2, 8: 1})
+        assert self.get_distribution(client, title_id) == expected
+
+        url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review.json()['id']
+        )
+        user_client.patch(url, data={'score': 3})
+        expected.update({8: 0, 3: 1})
+        assert self.get_distribution(client, title_id) == expected, (
+            'Проверьте, что распределение оценок обновляется при изменении '
+            'оценки в отзыве.'
+        )
+
+        user_client.delete(url)
+        admin_client.delete(f'/api/v1/users/{moderator.username}/')
+        expected.update({3: 0, 10: 1})
+        assert self.get_distribution(client, title_id) == expected, (
+            'Проверьте, что распределение оценок обновляется при удалении '
+            'отзыва и его автора.'
+        )
+
+    def test_02_missing_title(self, client):
+        for title_id in (100500, 'abc'):
+            response = client.get(self.URL_TEMPLATE.format(title_id=title_id))
+            assert response.status_code == HTTPStatus.NOT_FOUND, (
+                'Проверьте, что для несуществующего произведения '
+                f'`{title_id}` возвращается ответ со статусом 404.'
+            )
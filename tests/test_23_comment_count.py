@@ -0,0 +1,108 @@
+from http import HTTPStatus
+
+import pytest
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23CommentCount:
+
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+    COMMENT_LIST_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def get_comment_count(self, client, title_id, review_id):
+        response = client.get(self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review_id
+        ))
+        assert response.status_code == HTTPStatus.OK
+        assert 'comment_count' in response.json(), (
+            'Проверьте, что в ответе на запрос к отзыву есть поле '
+            '`comment_count`.'
+        )
+        return response.json()['comment_count']
+
+    def test_01_comment_count(self, client, admin_client, user_client,
+                              moderator_client, moderator):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review_id = create_single_review(
+            admin_client, title_id, 'Отлично', 10
+        ).json()['id']
+        assert self.get_comment_count(client, title_id, review_id) == 0
+
+        url = self.COMMENT_LIST_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review_id
+        )
+        comment = user_client.post(url, data={'text': 'Согласен'})
+        assert comment.status_code == HTTPStatus.CREATED
+        moderator_client.post(url, data={'text': 'Не согласен'})
+        assert self.get_comment_count(client, title_id, review_id) == 2, (
+            'Проверьте, что счётчик комментариев увеличивается при '
+            'создании комментария.'
+        )
+
+        response = user_client.delete(f'{url}{comment.json()["id"]}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_comment_count(client, title_id, review_id) == 1, (
+            'Проверьте, что счётчик комментариев уменьшается при '
+            'удалении комментария.'
+        )
+
+        admin_client.delete(f'/api/v1/users/{moderator.username}/')
+        assert self.get_comment_count(client, title_id, review_id) == 0, (
+            'Проверьте, что счётчик комментариев уменьшается при '
+            'удалении автора комментария.'
+        )
+
+    def test_02_comment_count_is_read_only(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review_id = create_single_review(
+            admin_client, title_id, 'Отлично', 10
+        ).json()['id']
+        response = admin_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=review_id
+            ),
+            data={'comment_count': 100}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['comment_count'] == 0, (
+            'Проверьте, что поле `comment_count` доступно только для чтения.'
+        )
+
+    def test_03_stale_review_save_keeps_count(self, client, admin_client,
+                                              user_client):
+        from reviews.models import Review
+
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review_id = create_single_review(
+            admin_client, title_id, 'Отлично', 10
+        ).json()['id']
+        stale = Review.objects.get(pk=review_id)
+        user_client.post(
+            self.COMMENT_LIST_URL_TEMPLATE.format(
+                title_id=title_id, review_id=review_id
+            ),
+            data={'text': 'Согласен'}
+        )
+        touched_at = Review.objects.get(pk=review_id).updated_at
+
+        stale.text = 'Хорошо'
+        stale.save()
+        review = Review.objects.get(pk=review_id)
+        assert review.comment_count == 1, (
+            'Проверьте, что сохранение отзыва не затирает счётчик '
+            'комментариев, изменённый после загрузки отзыва.'
+        )
+        assert review.updated_at >= touched_at, (
+            'Проверьте, что сохранение отзыва не откатывает дату изменения.'
+        )
+        assert review.text == 'Хорошо'
+        assert stale.comment_count == 1
+        assert self.get_comment_count(client, title_id, review_id) == 1
@@ -0,0 +1,66 @@
+from http import HTTPStatus
+
+import pytest
+from tests.utils import capture_queries, create_commented_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24EmbeddedComments:
+
+    QUERY_BUDGET = 4
+    URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    @pytest.mark.parametrize('size', (1, 5, 10))
+    def test_01_latest_comments(self, client, size):
+        title, comments = create_commented_reviews(size)
+        url = self.URL_TEMPLATE.format(title_id=title.id) + '?comments=3'
+        response, queries = capture_queries(client.get, url)
+        assert response.status_code == HTTPStatus.OK
+        queries = len(queries)
+        assert queries <= self.QUERY_BUDGET, (
+            f'Проверьте, что GET-запрос к `{url}` загружает комментарии '
+            f'всех отзывов одним запросом. Сейчас запросов: {queries}.'
+        )
+        for review in response.json()['results']:
+            expected = comments[review['id']][::-1][:3]
+            assert [
+                comment['id'] for comment in review['comments']
+            ] == expected, (
+                'Проверьте, что в отзыв встраиваются последние N '
+                'комментариев, начиная с самого нового.'
+            )
+            assert review['comment_count'] == len(comments[review['id']])
+
+    def test_02_comments_are_opt_in(self, client):
+        title, _ = create_commented_reviews(2)
+        url = self.URL_TEMPLATE.format(title_id=title.id)
+        for query in ('', '?comments=0'):
+            response = client.get(url + query)
+            assert response.status_code == HTTPStatus.OK
+            assert 'comments' not in response.json()['results'][0], (
+                'Проверьте, что комментарии встраиваются в отзывы только '
+                'по параметру `comments`.'
+            )
+        review_id = response.json()['results'][0]['id']
+        response = client.get(f'{url}{review_id}/?comments=3')
+        assert 'comments' not in response.json()
+
+    def test_03_invalid_limit(self, client):
+        title, _ = create_commented_reviews(1)
+        url = self.URL_TEMPLATE.format(title_id=title.id)
+        for value in ('abc', '-1'):
+            response = client.get(f'{url}?comments={value}')
+            assert response.status_code == HTTPStatus.BAD_REQUEST, (
+                'Проверьте, что при некорректном значении параметра '
+                '`comments` возвращается ответ со статусом 400.'
+            )
+
+    def test_04_with_cursor(self, client):
+        title, comments = create_commented_reviews(3)
+        url = self.URL_TEMPLATE.format(title_id=title.id)
+        response = client.get(f'{url}?cursor=&comments=1')
+        assert response.status_code == HTTPStatus.OK
+        for review in response.json()['results']:
+            assert [comment['id'] for comment in review['comments']] == (
+                comments[review['id']][-1:]
+            )
@@ -0,0 +1,267 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25ReviewChanges:
+
+    URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/changes/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_changes(self, client, title_id, since=None):
+        url = self.URL_TEMPLATE.format(title_id=title_id)
+        response = client.get(url, {'since': since} if since else {})
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.URL_TEMPLATE}` возвращает '
+            'ответ со статусом 200.'
+        )
+        data = response.json()
+        for field in ('reviews', 'comments', 'deleted', 'since', 'has_more'):
+            assert field in data, (
+                f'Проверьте, что в ответе есть поле `{field}`.'
+            )
+        return data
+
+    @staticmethod
+    def ids(items):
+        return sorted(item['id'] for item in items)
+
+    def create_data(self, admin, admin_client, user, user_client, moderator,
+                    moderator_client):
+        return create_comments(admin_client, {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        })
+
+    def test_01_changes_after_cursor(self, client, admin, admin_client, user,
+                                     user_client, moderator,
+                                     moderator_client):
+        comments, reviews, titles = self.create_data(
+            admin, admin_client, user, user_client, moderator,
+            moderator_client
+        )
+        title_id = titles[0]['id']
+        data = self.get_changes(client, title_id)
+        assert self.ids(data['reviews']) == self.ids(reviews), (
+            'Проверьте, что без курсора возвращаются все отзывы произведения.'
+        )
+        assert self.ids(data['comments']) == self.ids(comments), (
+            'Проверьте, что без курсора возвращаются все комментарии к '
+            'отзывам произведения.'
+        )
+        assert data['deleted'] == [] and data['has_more'] is False
+        since = data['since']
+        data = self.get_changes(client, title_id, since)
+        assert not data['reviews'] and not data['comments'], (
+            'Проверьте, что после курсора возвращаются только изменения.'
+        )
+        assert data['since'] == since
+
+        review_url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=reviews[0]['id']
+        )
+        admin_client.patch(review_url, data={'text': 'Новый текст'})
+        comment = user_client.post(
+            f'{review_url}comments/', data={'text': 'Новый комментарий'}
+        ).json()
+        data = self.get_changes(client, title_id, since)
+        assert self.ids(data['reviews']) == [reviews[0]['id']], (
+            'Проверьте, что изменённый отзыв попадает в список изменений.'
+        )
+        assert data['reviews'][0]['text'] == 'Новый текст'
+        assert data['reviews'][0]['comment_count'] == 4
+        assert self.ids(data['comments']) == [comment['id']]
+        assert data['comments'][0]['review'] == reviews[0]['id']
+        since = data['since']
+
+        response = admin_client.delete(review_url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        data = self.get_changes(client, title_id, since)
+        deleted = {(item['kind'], item['id']) for item in data['deleted']}
+        assert ('review', reviews[0]['id']) in deleted, (
+            'Проверьте, что удалённый отзыв попадает в список удалённых.'
+        )
+        assert {
+            ('comment', item['id']) for item in comments + [comment]
+        } <= deleted, (
+            'Проверьте, что комментарии, удалённые вместе с отзывом, '
+            'попадают в список удалённых.'
+        )
+        data = self.get_changes(client, title_id, data['since'])
+        assert data['deleted'] == []
+
+    def test_02_has_more(self, client, admin, admin_client, user,
+                         user_client, moderator, moderator_client,
+                         monkeypatch):
+        from api.sync import ChangeFeed
+
+        monkeypatch.setattr(ChangeFeed, 'page_size', 1)
+        comments, reviews, titles = self.create_data(
+            admin, admin_client, user, user_client, moderator,
+            moderator_client
+        )
+        title_id = titles[0]['id']
+        seen_reviews, seen_comments = [], []
+        since, has_more = None, True
+        while has_more:
+            data = self.get_changes(client, title_id, since)
+            assert len(data['reviews']) <= 1
+            seen_reviews += data['reviews']
+            seen_comments += data['comments']
+            since, has_more = data['since'], data['has_more']
+        assert self.ids(seen_reviews) == self.ids(reviews), (
+            'Проверьте, что при `has_more` следующий запрос с новым '
+            'курсором возвращает оставшиеся изменения.'
+        )
+        assert self.ids(seen_comments) == self.ids(comments)
+
+    @pytest.mark.parametrize('since', ('abc', 'eyJhIjoxfQ=='))
+    def test_03_invalid_cursor(self, client, admin_client, since):
+        from reviews.models import Title
+
+        title = Title.objects.create(name='Терминатор', year=1984)
+        response = client.get(
+            self.URL_TEMPLATE.format(title_id=title.id), {'since': since}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что при некорректном курсоре возвращается ответ '
+            'со статусом 400.'
+        )
+
+    def test_04_change_with_lagging_clock(self, client, admin, admin_client,
+                                          user, user_client, moderator,
+                                          moderator_client, monkeypatch):
+        from datetime import timedelta
+
+        from django.utils import timezone
+
+        comments, reviews, titles = self.create_data(
+            admin, admin_client, user, user_client, moderator,
+            moderator_client
+        )
+        title_id = titles[0]['id']
+        since = self.get_changes(client, title_id)['since']
+
+        # Запрос, который начался раньше, но закоммитился позже курсора.
+        past = timezone.now() - timedelta(minutes=5)
+        monkeypatch.setattr(timezone, 'now', lambda: past)
+        comment = user_client.post(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            ) + 'comments/',
+            data={'text': 'Поздний комментарий'}
+        ).json()
+        monkeypatch.undo()
+
+        data = self.get_changes(client, title_id, since)
+        assert self.ids(data['comments']) == [comment['id']], (
+            'Проверьте, что изменение попадает в синхронизацию, даже если '
+            'его время меньше времени уже отданных изменений.'
+        )
+        assert self.ids(data['reviews']) == [reviews[1]['id']]
+
+    def test_05_changes_use_indexes(self, client, admin, admin_client, user,
+                                    user_client, moderator,
+                                    moderator_client):
+        if connection.vendor != 'sqlite':
+            pytest.skip('EXPLAIN QUERY PLAN поддерживается только SQLite.')
+        _, _, titles = self.create_data(
+            admin, admin_client, user, user_client, moderator,
+            moderator_client
+        )
+        with CaptureQueriesContext(connection) as context:
+            self.get_changes(client, titles[0]['id'])
+        for query in context.captured_queries:
+            if 'change_seq" >' not in query['sql']:
+                continue
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+                plan = [row[-1] for row in cursor.fetchall()]
+            assert not any('TEMP B-TREE' in step for step in plan), (
+                'Проверьте, что изменения читаются по индексу '
+                f'(произведение, номер изменения): `{query["sql"]}`.'
+            )
+
+    def test_06_save_with_update_fields(self, client, admin, admin_client,
+                                        user, user_client, moderator,
+                                        moderator_client):
+        from reviews.models import Comment, Review
+
+        comments, reviews, titles = self.create_data(
+            admin, admin_client, user, user_client, moderator,
+            moderator_client
+        )
+        title_id = titles[0]['id']
+        since = self.get_changes(client, title_id)['since']
+        review = Review.objects.get(pk=reviews[0]['id'])
+        review.text = 'Исправленный текст'
+        review.save(update_fields=['text'])
+        comment = Comment.objects.get(pk=comments[0]['id'])
+        comment.text = 'Исправленный комментарий'
+        comment.save(update_fields=['text'])
+        data = self.get_changes(client, title_id, since)
+        assert self.ids(data['reviews']) == [review.id], (
+            'Проверьте, что отзыв, сохранённый с `update_fields`, попадает '
+            'в список изменений.'
+        )
+        assert self.ids(data['comments']) == [comment.id]
+
+    def test_07_title_delete_leaves_no_tombstones(self, admin, admin_client,
+                                                  user, user_client,
+                                                  moderator,
+                                                  moderator_client):
+        from reviews.models import Tombstone
+
+        _, _, titles = self.create_data(
+            admin, admin_client, user, user_client, moderator,
+            moderator_client
+        )
+        title_id = titles[0]['id']
+        response = admin_client.delete(f'/api/v1/titles/{title_id}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert not Tombstone.objects.filter(title_id=title_id).exists(), (
+            'Проверьте, что при удалении произведения отметки об удалении '
+            'его отзывов и комментариев не сохраняются.'
+        )
+
+    def test_08_pruned_tombstones(self, client, admin, admin_client, user,
+                                  user_client, moderator, moderator_client):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        from reviews.models import Tombstone
+
+        _, reviews, titles = self.create_data(
+            admin, admin_client, user, user_client, moderator,
+            moderator_client
+        )
+        title_id = titles[0]['id']
+        url = self.URL_TEMPLATE.format(title_id=title_id)
+        old_since = self.get_changes(client, title_id)['since']
+        admin_client.delete(self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=reviews[0]['id']
+        ))
+        since = self.get_changes(client, title_id, old_since)['since']
+        assert Tombstone.objects.filter(title_id=title_id).exists()
+
+        out = StringIO()
+        call_command('prune_tombstones', '--days', '0', stdout=out)
+        assert not Tombstone.objects.exists(), (
+            'Проверьте, что команда `prune_tombstones` удаляет старые '
+            'отметки об удалении.'
+        )
+        assert 'Pruned:' in out.getvalue()
+        response = client.get(url, {'since': old_since})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Проверьте, что курсор старше удалённых отметок отклоняется.'
+        )
+        self.get_changes(client, title_id, since)
+        self.get_changes(client, title_id)
@@ -0,0 +1,73 @@
+import json
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from tests.utils import create_commented_reviews
+
+
+def read_lines(response):
+    content = b''.join(response.streaming_content).decode()
+    assert content.endswith('\n')
+    return [json.loads(line) for line in content.splitlines()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26ReviewExport:
+
+    URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/export/'
+
+    def test_01_only_admin(self, client, user_client, moderator_client):
+        title, _ = create_commented_reviews(1)
+        url = self.URL_TEMPLATE.format(title_id=title.id)
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что выгрузка отзывов недоступна анонимному '
+            'пользователю.'
+        )
+        for role_client in (user_client, moderator_client):
+            assert role_client.get(url).status_code == HTTPStatus.FORBIDDEN, (
+                'Проверьте, что выгрузка отзывов доступна только '
+                'администратору.'
+            )
+
+    @pytest.mark.parametrize('chunk_size', (1, 4, 1000))
+    def test_02_ndjson_stream(self, admin_client, chunk_size, monkeypatch):
+        from reviews import constants
+
+        monkeypatch.setattr(constants, 'EXPORT_CHUNK_SIZE', chunk_size)
+        title, comments = create_commented_reviews(6)
+        url = self.URL_TEMPLATE.format(title_id=title.id)
+        # Пользователь токена уже в кеше, как при повторных запросах.
+        admin_client.get('/api/v1/users/me/')
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get(url + '?include=comments')
+            assert response.status_code == HTTPStatus.OK
+            assert response.streaming, (
+                'Проверьте, что выгрузка отдаётся потоковым ответом.'
+            )
+            assert response['Content-Type'].startswith('application/x-ndjson')
+            lines = read_lines(response)
+        reviews = [line for line in lines if line['type'] == 'review']
+        exported_comments = [
+            line for line in lines if line['type'] == 'comment'
+        ]
+        assert sorted(review['id'] for review in reviews) == sorted(comments)
+        assert sorted(comment['id'] for comment in exported_comments) == (
+            sorted(sum(comments.values(), []))
+        ), 'Проверьте, что с `include=comments` выгружаются комментарии.'
+        for comment in exported_comments:
+            assert comment['id'] in comments[comment['review']]
+        assert len(context.captured_queries) <= 6, (
+            'Проверьте, что количество SQL-запросов при выгрузке не '
+            'зависит от количества отзывов.'
+        )
+
+    def test_03_without_comments(self, admin_client):
+        title, comments = create_commented_reviews(3)
+        response = admin_client.get(
+            self.URL_TEMPLATE.format(title_id=title.id)
+        )
+        lines = read_lines(response)
+        assert {line['type'] for line in lines} == {'review'}
+        assert len(lines) == len(comments)
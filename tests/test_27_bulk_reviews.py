@@ -0,0 +1,135 @@
+from http import HTTPStatus
+
+import pytest
+from tests.utils import capture_queries, create_authors
+
+
+def create_titles_and_authors(titles_count, authors_count):
+    from reviews.models import Title
+
+    titles = [
+        Title.objects.create(name=f'Произведение {idx}', year=2000)
+        for idx in range(titles_count)
+    ]
+    return titles, create_authors(authors_count)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27BulkReviews:
+
+    URL = '/api/v1/reviews/bulk/'
+
+    def test_01_only_admin(self, client, user_client, moderator_client):
+        titles, authors = create_titles_and_authors(1, 1)
+        data = [{
+            'title': titles[0].id, 'author': authors[0].username,
+            'text': 'Отзыв', 'score': 5
+        }]
+        assert client.post(
+            self.URL, data=data, content_type='application/json'
+        ).status_code == HTTPStatus.UNAUTHORIZED
+        for role_client in (user_client, moderator_client):
+            response = role_client.post(
+                self.URL, data=data, format='json'
+            )
+            assert response.status_code == HTTPStatus.FORBIDDEN, (
+                'Проверьте, что пакетная загрузка отзывов доступна только '
+                'администратору.'
+            )
+
+    def test_02_bulk_ingest(self, client, admin_client, monkeypatch):
+        from api.ingest import ReviewIngest
+        from reviews.models import Review
+
+        monkeypatch.setattr(ReviewIngest, 'batch_size', 7)
+        titles, authors = create_titles_and_authors(3, 10)
+        Review.objects.create(
+            title=titles[0], author=authors[0], text='Отзыв', score=1
+        )
+        title_url = f'/api/v1/titles/{titles[0].id}/'
+        assert client.get(title_url).json()['rating'] == 1
+
+        data = [
+            {'title': title.id, 'author': author.username,
+             'text': 'Отзыв', 'score': 10}
+            for title in titles for author in authors[1:]
+        ]
+        data += [
+            {'title': titles[0].id, 'author': authors[0].username,
+             'text': 'Повтор', 'score': 5},
+            {'title': titles[1].id, 'author': authors[1].username,
+             'text': 'Повтор в запросе', 'score': 5},
+            {'title': 100500, 'author': authors[0].username,
+             'text': 'Отзыв', 'score': 5},
+            {'title': titles[1].id, 'author': 'nobody',
+             'text': 'Отзыв', 'score': 5},
+            {'title': titles[1].id, 'author': authors[0].username,
+             'text': 'Отзыв', 'score': 11},
+            'не отзыв',
+        ]
+        response = admin_client.post(
+            self.URL, data=data, format='json'
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        result = response.json()
+        assert result['created'] == 27, (
+            'Проверьте, что все корректные отзывы загружены.'
+        )
+        errors = {
+            error['index']: error['errors'] for error in result['errors']
+        }
+        assert sorted(errors) == list(range(27, 33)), (
+            'Проверьте, что для каждого некорректного отзыва возвращается '
+            'ошибка с его номером в запросе.'
+        )
+        assert 'title' in errors[29] and 'author' in errors[30]
+        assert 'score' in errors[31]
+        assert Review.objects.count() == 28
+
+        assert client.get(title_url).json()['rating'] == 9, (
+            'Проверьте, что после пакетной загрузки пересчитывается рейтинг '
+            'произведения и сбрасывается кеш.'
+        )
+        distribution = {
+            item['score']: item['count'] for item in client.get(
+                f'{title_url}rating-distribution/'
+            ).json()
+        }
+        assert distribution[1] == 1 and distribution[10] == 9
+
+        change_seqs = list(Review.objects.filter(
+            title=titles[0]
+        ).values_list('change_seq', flat=True))
+        assert sorted(change_seqs) == list(range(1, 11)), (
+            'Проверьте, что загруженные отзывы получают номера изменений '
+            'произведения и попадают в синхронизацию.'
+        )
+
+    def test_03_queries_per_batch(self, admin_client, monkeypatch):
+        from api.ingest import ReviewIngest
+
+        monkeypatch.setattr(ReviewIngest, 'batch_size', 1000)
+        titles, authors = create_titles_and_authors(2, 50)
+        data = [
+            {'title': title.id, 'author': author.username,
+             'text': 'Отзыв', 'score': 7}
+            for title in titles for author in authors
+        ]
+        # Пользователь токена уже в кеше, как при повторных запросах.
+        admin_client.get('/api/v1/users/me/')
+        response, queries = capture_queries(
+            admin_client.post, self.URL, data=data, format='json'
+        )
+        assert response.json()['created'] == len(data)
+        queries = len(queries)
+        assert queries <= 20, (
+            'Проверьте, что отзывы загружаются пакетами, а рейтинг '
+            f'обновляется один раз на произведение. Запросов: {queries}.'
+        )
+
+    def test_04_invalid_payload(self, admin_client):
+        for data in ({'title': 1}, []):
+            response = admin_client.post(
+                self.URL, data=data, format='json'
+            )
+            assert response.status_code == HTTPStatus.BAD_REQUEST
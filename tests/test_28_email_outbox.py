@@ -0,0 +1,151 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+
+def send_outbox(*args):
+    out = StringIO()
+    call_command('send_outbox', '--once', *args, stdout=out)
+    return out.getvalue()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28EmailOutbox:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+
+    def signup(self, client, idx):
+        return client.post(self.URL_SIGNUP, data={
+            'email': f'user{idx}@yamdb.fake', 'username': f'user{idx}'
+        })
+
+    def test_01_signup_enqueues_email(self, client):
+        from reviews.models import OutgoingEmail
+
+        self.signup(client, 1)
+        assert not mail.outbox, (
+            'Проверьте, что письмо с кодом подтверждения не отправляется '
+            'во время запроса.'
+        )
+        assert OutgoingEmail.objects.filter(
+            recipient='user1@yamdb.fake'
+        ).exists(), 'Проверьте, что письмо ставится в очередь.'
+
+        output = send_outbox()
+        assert [message.to for message in mail.outbox] == [
+            ['user1@yamdb.fake']
+        ]
+        assert 'sent=1' in output, (
+            'Проверьте, что команда выводит статистику по пачке писем.'
+        )
+        assert not OutgoingEmail.objects.exists()
+
+    def test_02_batches(self, client):
+        for idx in range(5):
+            self.signup(client, idx)
+        output = send_outbox('--batch-size', '2')
+        assert len(mail.outbox) == 5
+        assert output.count('Batch:') == 3, (
+            'Проверьте, что очередь отправляется пачками.'
+        )
+
+    def test_03_retry_with_backoff(self, client, monkeypatch):
+        from django.core.mail.backends.locmem import EmailBackend
+
+        from reviews import constants
+        from reviews.models import OutgoingEmail
+
+        def fail(self, messages):
+            raise ConnectionError('Сервер недоступен')
+
+        self.signup(client, 1)
+        with monkeypatch.context() as patch:
+            patch.setattr(EmailBackend, 'send_messages', fail)
+            output = send_outbox()
+        assert 'failed=1' in output and not mail.outbox
+        email = OutgoingEmail.objects.get()
+        assert email.attempts == 1 and 'Сервер' in email.last_error
+        assert email.next_attempt_at > timezone.now(), (
+            'Проверьте, что после ошибки отправка откладывается.'
+        )
+
+        send_outbox()
+        assert not mail.outbox, (
+            'Проверьте, что письмо не отправляется повторно до истечения '
+            'задержки.'
+        )
+        email.next_attempt_at = timezone.now() - timedelta(seconds=1)
+        email.save()
+        send_outbox()
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что после задержки письмо отправляется повторно.'
+        )
+
+        monkeypatch.setattr(constants, 'OUTBOX_MAX_ATTEMPTS', 1)
+        monkeypatch.setattr(EmailBackend, 'send_messages', fail)
+        self.signup(client, 2)
+        assert 'dead=1' in send_outbox()
+        assert OutgoingEmail.objects.get().next_attempt_at is None, (
+            'Проверьте, что после исчерпания попыток письмо остаётся в '
+            'базе и больше не отправляется.'
+        )
+
+    def test_04_connection_failure(self, client, monkeypatch):
+        from django.core.mail.backends.locmem import EmailBackend
+
+        from reviews.models import OutgoingEmail
+
+        def fail(self):
+            raise ConnectionRefusedError('Сервер недоступен')
+
+        for idx in range(3):
+            self.signup(client, idx)
+        with monkeypatch.context() as patch:
+            patch.setattr(EmailBackend, 'open', fail)
+            output = send_outbox()
+        assert 'claimed=3' in output and 'failed=3' in output, (
+            'Проверьте, что при недоступном почтовом сервере каждое письмо '
+            'пачки считается неудачной попыткой, а команда не падает.'
+        )
+        for email in OutgoingEmail.objects.all():
+            assert email.attempts == 1 and 'Сервер' in email.last_error
+            assert email.next_attempt_at > timezone.now(), (
+                'Проверьте, что после ошибки соединения отправка '
+                'откладывается.'
+            )
+        assert not mail.outbox
+
+    def test_05_worker_survives_errors(self, monkeypatch):
+        from reviews.management.commands import send_outbox as command
+        from reviews.outbox import BatchStats
+
+        class Stop(Exception):
+            pass
+
+        results = [ConnectionError('База недоступна'),
+                   BatchStats(0, 0, 0, 0, 0)]
+
+        def send_batch(batch_size):
+            result = results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        def sleep(seconds):
+            if not results:
+                raise Stop
+
+        monkeypatch.setattr(command, 'send_batch', send_batch)
+        monkeypatch.setattr(command.time, 'sleep', sleep)
+        err = StringIO()
+        with pytest.raises(Stop):
+            call_command('send_outbox', stdout=StringIO(), stderr=err)
+        assert 'База недоступна' in err.getvalue(), (
+            'Проверьте, что ошибка пачки выводится, а обработчик '
+            'продолжает работать.'
+        )
+        assert not results
@@ -0,0 +1,100 @@
+from http import HTTPStatus
+
+import pytest
+from tests.utils import capture_queries
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29CachedAuthentication:
+
+    URL = '/api/v1/categories/'
+    URL_ME = '/api/v1/users/me/'
+
+    def test_01_user_is_cached(self, user_client, user):
+        response, queries = capture_queries(user_client.get, self.URL_ME)
+        assert response.status_code == HTTPStatus.OK
+        assert len(queries) == 1
+        response, queries = capture_queries(user_client.get, self.URL_ME)
+        assert response.json()['username'] == user.username
+        assert not queries, (
+            'Проверьте, что при повторном запросе пользователь берётся из '
+            f'кеша, а не из базы данных. Запросы: {queries}'
+        )
+
+    def test_02_role_change(self, admin_client, user_client, user):
+        data = {'name': 'Фильм', 'slug': 'film'}
+        response = user_client.post(self.URL, data=data)
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = user_client.post(self.URL, data=data)
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что после смены роли пользователя кеш сбрасывается.'
+        )
+
+    def test_03_blocked_and_deleted(self, user_client, user):
+        assert user_client.get(self.URL_ME).status_code == HTTPStatus.OK
+        user.is_active = False
+        user.save()
+        assert user_client.get(self.URL_ME).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что заблокированный пользователь не проходит проверку.'
+        user.is_active = True
+        user.save()
+        assert user_client.get(self.URL_ME).status_code == HTTPStatus.OK
+        user.delete()
+        assert user_client.get(self.URL_ME).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что удалённый пользователь не проходит проверку.'
+
+    def test_04_cache_shared_between_processes(self, user_client, user):
+        from django.conf import settings
+        from django.core.cache import caches
+
+        from api.authentication import USER_KEY
+
+        assert user_client.get(self.URL_ME).status_code == HTTPStatus.OK
+        # Отдельный экземпляр бэкенда, как в другом процессе.
+        other = caches.create_connection(settings.SHARED_CACHE_ALIAS)
+        key = USER_KEY.format(user.id)
+        assert other.get(key) is not None, (
+            'Проверьте, что пользователь хранится в общем для всех '
+            'процессов кеше.'
+        )
+        user.bio = 'Новое описание'
+        user.save()
+        assert other.get(key) is None, (
+            'Проверьте, что после сохранения пользователя запись сбрасывается '
+            'во всех процессах.'
+        )
+
+    def test_05_process_local_shared_cache(self, settings):
+        from api.checks import check_shared_cache
+
+        settings.CACHES = {
+            **settings.CACHES,
+            settings.SHARED_CACHE_ALIAS: {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            },
+        }
+        assert [error.id for error in check_shared_cache(None)] == [
+            'api.W001'
+        ], (
+            'Проверьте, что проверка развёртывания предупреждает об общем '
+            'кеше в памяти процесса.'
+        )
+        settings.CACHES = {
+            **settings.CACHES,
+            settings.SHARED_CACHE_ALIAS: {
+                'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+                'LOCATION': 'api_yamdb_cache',
+            },
+        }
+        assert [error.id for error in check_shared_cache(None)] == [
+            'api.W001'
+        ], (
+            'Проверьте, что проверка развёртывания предупреждает об общем '
+            'кеше в базе данных.'
+        )
@@ -0,0 +1,201 @@
+import time
+from http import HTTPStatus
+
+import pytest
+from rest_framework.test import APIClient
+from tests.utils import capture_queries
+
+
+def get_token_client(client, user):
+    from django.contrib.auth.tokens import default_token_generator
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    response = client.post('/api/v1/auth/token/', data={
+        'username': user.username,
+        'confirmation_code': default_token_generator.make_token(user)
+    })
+    assert response.status_code == HTTPStatus.OK
+    token = AccessToken(response.json()['access'])
+    token_client = APIClient()
+    token_client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return token_client, token
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30TokenClaims:
+
+    URL_CATEGORIES = '/api/v1/categories/'
+
+    @pytest.fixture(autouse=True)
+    def stateless_authentication(self, monkeypatch):
+        # Режим включается в настройках, представления получают классы
+        # аутентификации при импорте.
+        from rest_framework.views import APIView
+
+        from api.authentication import StatelessJWTAuthentication
+
+        monkeypatch.setattr(
+            APIView, 'authentication_classes', (StatelessJWTAuthentication,)
+        )
+
+    def test_01_claims(self, client, admin, user):
+        _, token = get_token_client(client, admin)
+        assert token['role'] == 'admin' and token['is_superuser'] is False, (
+            'Проверьте, что access-токен содержит роль пользователя.'
+        )
+        assert 'iat' in token
+        _, token = get_token_client(client, user)
+        assert token['role'] == 'user'
+
+    def test_02_no_user_queries(self, client, admin, user):
+        admin_client, _ = get_token_client(client, admin)
+        response, queries = capture_queries(
+            admin_client.post, self.URL_CATEGORIES,
+            data={'name': 'Фильм', 'slug': 'film'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        assert not [
+            query for query in queries
+            if query != 'BEGIN' and 'reviews_category' not in query
+            and 'reviews_searchtrigram' not in query
+        ], (
+            'Проверьте, что права администратора проверяются по токену, '
+            'без запросов к таблице пользователей или кешу в базе данных.'
+        )
+        user_client, _ = get_token_client(client, user)
+        response, queries = capture_queries(
+            user_client.post, self.URL_CATEGORIES,
+            data={'name': 'Книга', 'slug': 'book'}
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        assert not queries, (
+            'Проверьте, что отказ в правах по токену не делает запросов к '
+            f'базе данных. Запросы: {queries}'
+        )
+
+    def test_03_token_user_writes(self, client, user):
+        from reviews.models import Title
+
+        title = Title.objects.create(name='Терминатор', year=1984)
+        user_client, _ = get_token_client(client, user)
+        url = f'/api/v1/titles/{title.id}/reviews/'
+        response = user_client.post(url, data={'text': 'Отзыв', 'score': 7})
+        assert response.status_code == HTTPStatus.CREATED, (
+            'Проверьте, что пользователь из токена может оставить отзыв.'
+        )
+        assert response.json()['author'] == user.username
+        review_url = f'{url}{response.json()["id"]}/'
+        response = user_client.patch(review_url, data={'score': 8})
+        assert response.status_code == HTTPStatus.OK
+        response = user_client.post(
+            f'{review_url}comments/', data={'text': 'Комментарий'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['email'] == user.email, (
+            'Проверьте, что `/users/me/` возвращает полный профиль '
+            'пользователя из токена.'
+        )
+
+    def test_04_revoked_claims(self, client, admin):
+        admin_client, _ = get_token_client(client, admin)
+        assert admin_client.post(self.URL_CATEGORIES, data={
+            'name': 'Фильм', 'slug': 'film'
+        }).status_code == HTTPStatus.CREATED
+        admin.role = 'user'
+        admin.save()
+        response = admin_client.post(
+            self.URL_CATEGORIES, data={'name': 'Книга', 'slug': 'book'}
+        )
+        assert response.status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что после смены роли старый токен не даёт прежних '
+            'прав.'
+        )
+        # Новый токен выдаётся в следующую секунду после отзыва.
+        time.sleep(1.1)
+        user_client, token = get_token_client(client, admin)
+        assert token['role'] == 'user'
+        response, queries = capture_queries(
+            user_client.get, self.URL_CATEGORIES
+        )
+        assert response.status_code == HTTPStatus.OK
+        # Только подсчёт и выборка категорий.
+        assert len(queries) == 2 and all(
+            'FROM "reviews_category"' in query for query in queries
+        ), f'Проверьте, что новый токен не требует запросов. {queries}'
+
+        admin.is_active = False
+        admin.save()
+        assert user_client.get(self.URL_CATEGORIES).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что токен заблокированного пользователя не работает.'
+
+    def test_05_deleted_user(self, client, user):
+        user_client, _ = get_token_client(client, user)
+        assert user_client.get(self.URL_CATEGORIES).status_code == (
+            HTTPStatus.OK
+        )
+        user.delete()
+        assert user_client.get(self.URL_CATEGORIES).status_code == (
+            HTTPStatus.UNAUTHORIZED
+        ), 'Проверьте, что токен удалённого пользователя не работает.'
+
+    def test_06_deleted_user_without_revocation(self, client, user):
+        from django.db import connection as db
+
+        from reviews.models import Title
+
+        title = Title.objects.create(name='Терминатор', year=1984)
+        user_client, _ = get_token_client(client, user)
+        # Удаление в обход сигналов: отметки об отзыве нет.
+        with db.cursor() as cursor:
+            cursor.execute('DELETE FROM reviews_user WHERE id = %s', [user.id])
+        response = user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'Отзыв', 'score': 7}
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что запись от удалённого пользователя с '
+            'неотозванным токеном отклоняется как неаутентифицированная, '
+            'а не как повторный отзыв.'
+        )
+
+    def test_07_requires_shared_cache(self, settings, tmp_path):
+        from django.core.management import call_command
+        from django.core.management.base import SystemCheckError
+
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_AUTHENTICATION_CLASSES': [
+                'api.authentication.StatelessJWTAuthentication',
+            ],
+        }
+        settings.CACHES = {
+            **settings.CACHES,
+            settings.SHARED_CACHE_ALIAS: {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            },
+        }
+        with pytest.raises(SystemCheckError, match='api.E001'):
+            call_command('check', '--tag', 'security')
+        # Кеш в базе данных добавляет запрос к каждому обращению.
+        settings.CACHES = {
+            **settings.CACHES,
+            settings.SHARED_CACHE_ALIAS: {
+                'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+                'LOCATION': 'api_yamdb_cache',
+            },
+        }
+        with pytest.raises(SystemCheckError, match='api.E001'):
+            call_command('check', '--tag', 'security')
+        # Файловый кеш виден всем процессам на одной машине.
+        settings.CACHES = {
+            **settings.CACHES,
+            settings.SHARED_CACHE_ALIAS: {
+                'BACKEND':
+                'django.core.cache.backends.filebased.FileBasedCache',
+                'LOCATION': str(tmp_path),
+            },
+        }
+        call_command('check', '--tag', 'security')
@@ -0,0 +1,89 @@
+import time
+from datetime import timedelta
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+
+def make_client(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+class Test31TokenCache:
+
+    URL = '/api/v1/users/me/'
+
+    def test_01_repeated_token_is_cached(self, user, monkeypatch):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        from api.authentication import token_cache
+
+        token = AccessToken.for_user(user)
+        client = make_client(token)
+        stats = token_cache.get_stats()
+        assert client.get(self.URL).status_code == HTTPStatus.OK
+
+        def fail(self, *args, **kwargs):
+            raise AssertionError('Подпись токена проверяется повторно.')
+
+        monkeypatch.setattr(AccessToken, 'verify', fail)
+        for _ in range(3):
+            assert client.get(self.URL).status_code == HTTPStatus.OK, (
+                'Проверьте, что проверенный токен берётся из кеша.'
+            )
+        new_stats = token_cache.get_stats()
+        assert new_stats['hits'] - stats['hits'] == 3
+        assert new_stats['misses'] - stats['misses'] == 1
+        assert 0 < new_stats['hit_ratio'] <= 1
+
+    def test_02_expired_token(self, user):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        token = AccessToken.for_user(user)
+        token.set_exp(lifetime=timedelta(seconds=1))
+        client = make_client(token)
+        assert client.get(self.URL).status_code == HTTPStatus.OK
+        time.sleep(1.1)
+        assert client.get(self.URL).status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что истёкший токен не берётся из кеша.'
+        )
+
+    def test_03_invalid_token_not_cached(self, user):
+        from rest_framework_simplejwt.tokens import AccessToken
+
+        header, payload, signature = str(AccessToken.for_user(user)).split('.')
+        client = make_client(f'{header}.{payload}.{"A" * len(signature)}')
+        for _ in range(2):
+            assert client.get(self.URL).status_code == (
+                HTTPStatus.UNAUTHORIZED
+            )
+
+    def test_04_lru_bound(self):
+        from api.authentication import TokenCache
+
+        token = {'exp': time.time() + 60}
+        cache = TokenCache(2)
+        for key in (b'a', b'b'):
+            cache.set(key, token)
+        assert cache.get(b'a') is token
+        cache.set(b'c', token)
+        assert cache.get(b'b') is None, (
+            'Проверьте, что из кеша вытесняется давно не использованный '
+            'токен.'
+        )
+        assert cache.get(b'a') is token and cache.get(b'c') is token
+        assert cache.get_stats()['size'] == 2
+
+    def test_05_benchmark(self):
+        out = StringIO()
+        call_command(
+            'benchmark_token_cache', '--requests', '200', '--tokens', '10',
+            stdout=out
+        )
+        assert 'Hit ratio:     0.950' in out.getvalue()
@@ -0,0 +1,160 @@
+import threading
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test32AuthThrottling:
+
+    URL_SIGNUP = '/api/v1/auth/signup/'
+    URL_TOKEN = '/api/v1/auth/token/'
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        from api.throttling import SlidingWindowThrottle
+
+        # 40 секунд от начала минутного окна.
+        now = [1000.0]
+        monkeypatch.setattr(
+            SlidingWindowThrottle, 'timer', lambda self: now[0]
+        )
+        return now
+
+    def signup(self, client, username, ip='10.0.0.1'):
+        return client.post(self.URL_SIGNUP, data={
+            'username': username, 'email': f'{username}@yamdb.fake'
+        }, REMOTE_ADDR=ip)
+
+    def test_01_signup_per_ip(self, client, clock):
+        for idx in range(10):
+            response = self.signup(client, f'user{idx}')
+            assert response.status_code == HTTPStatus.OK
+        response = self.signup(client, 'user10')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что количество регистраций с одного IP-адреса '
+            'ограничено.'
+        )
+        # До конца окна 20 секунд, ещё 6 — пока доля его 10 запросов не
+        # опустится до 9.
+        assert int(response['Retry-After']) == 26
+        assert self.signup(client, 'user10', ip='10.0.0.2').status_code == (
+            HTTPStatus.OK
+        ), 'Проверьте, что ограничение действует отдельно для каждого IP.'
+
+        clock[0] += 25
+        assert self.signup(client, 'user11').status_code == (
+            HTTPStatus.TOO_MANY_REQUESTS
+        )
+        clock[0] += 1
+        assert self.signup(client, 'user11').status_code == HTTPStatus.OK, (
+            'Проверьте, что лимит освобождается по мере сдвига окна.'
+        )
+        assert self.signup(client, 'user12').status_code == (
+            HTTPStatus.TOO_MANY_REQUESTS
+        )
+
+    def test_02_signup_per_username(self, client, clock):
+        for idx in range(3):
+            response = self.signup(client, 'bot', ip=f'10.0.1.{idx}')
+            assert response.status_code == HTTPStatus.OK
+        response = self.signup(client, 'bot', ip='10.0.1.100')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что количество запросов кода для одного `username` '
+            'ограничено независимо от IP-адреса.'
+        )
+
+    def test_03_token_per_username(self, client, clock, user):
+        data = {'username': user.username, 'confirmation_code': 'wrong'}
+        for idx in range(5):
+            response = client.post(
+                self.URL_TOKEN, data=data, REMOTE_ADDR=f'10.0.2.{idx}'
+            )
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = client.post(
+            self.URL_TOKEN, data=data, REMOTE_ADDR='10.0.2.100'
+        )
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что подбор кода подтверждения для одного '
+            '`username` ограничен.'
+        )
+
+    def test_04_non_dict_payload(self, client):
+        response = client.post(
+            self.URL_TOKEN, data=[1, 2], content_type='application/json'
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_05_parallel_requests_share_bucket(self, clock, user):
+        from django.db import connections
+        from rest_framework.test import APIClient
+
+        requests = 8
+        barrier = threading.Barrier(requests)
+        statuses = []
+
+        def post_token(idx):
+            try:
+                barrier.wait()
+                response = APIClient().post(self.URL_TOKEN, data={
+                    'username': user.username, 'confirmation_code': 'wrong'
+                }, REMOTE_ADDR=f'10.0.3.{idx}')
+                statuses.append(response.status_code)
+            finally:
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=post_token, args=(idx,))
+            for idx in range(requests)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(statuses) == [HTTPStatus.BAD_REQUEST] * 5 + [
+            HTTPStatus.TOO_MANY_REQUESTS
+        ] * (requests - 5), (
+            'Проверьте, что одновременные запросы не превышают лимит. '
+            f'Получено: {statuses}.'
+        )
+
+    def test_06_counter_in_shared_cache(self, client, clock):
+        from django.conf import settings
+        from django.core.cache import caches
+
+        self.signup(client, 'user1')
+        # Отдельный экземпляр бэкенда, как в другом процессе.
+        other = caches.create_connection(settings.THROTTLE_CACHE_ALIAS)
+        key = f'api:throttle:signup_ip:10.0.0.1:{int(clock[0] // 60)}'
+        assert other.get(key) == 1, (
+            'Проверьте, что счётчик запросов хранится в кеше '
+            'THROTTLE_CACHE_ALIAS, общем для всех процессов.'
+        )
+
+    def test_07_rejected_without_queries(self, client, clock):
+        for idx in range(3):
+            self.signup(client, 'bot', ip=f'10.0.4.{idx}')
+        with CaptureQueriesContext(connection) as context:
+            response = self.signup(client, 'bot', ip='10.0.4.100')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert not context.captured_queries, (
+            'Проверьте, что отклонённый запрос не обращается к базе данных. '
+            'Запросы: '
+            f'{[query["sql"] for query in context.captured_queries]}'
+        )
+
+    def test_08_forwarded_for_ignored(self, client, clock):
+        for idx in range(10):
+            response = client.post(self.URL_SIGNUP, data={
+                'username': f'user{idx}', 'email': f'user{idx}@yamdb.fake'
+            }, REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR=f'10.0.5.{idx}')
+            assert response.status_code == HTTPStatus.OK
+        response = client.post(self.URL_SIGNUP, data={
+            'username': 'user10', 'email': 'user10@yamdb.fake'
+        }, REMOTE_ADDR='10.0.0.1', HTTP_X_FORWARDED_FOR='10.0.5.100')
+        assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS, (
+            'Проверьте, что подмена заголовка `X-Forwarded-For` не обходит '
+            'ограничение по IP-адресу.'
+        )
@@ -1,5 +1,8 @@
 from http import HTTPStatus
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 check_name_and_slug_patterns = (
     (
         {
@@ -304,3 +307,70 @@ def check_fields(obj_type, url_pattern, obj, expected_data, detail=False):
         f'данные {obj_types[obj_type]}{results_in_msg}. Поле `id` не '
         'найдено или не является целым числом.'
     )
+
+
+def capture_queries(method, url, **kwargs):
+    """Выполняет запрос, возвращает ответ и SQL всех запросов к базе."""
+    with CaptureQueriesContext(connection) as context:
+        response = method(url, **kwargs)
+    return response, [query['sql'] for query in context.captured_queries]
+
+
+def count_queries(client, url):
+    """Выполняет GET-запрос, возвращает данные и число запросов к базе."""
+    response, queries = capture_queries(client.get, url)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+        'статусом 200.'
+    )
+    return response.json(), len(queries)
+
+
+def create_authors(size):
+    from reviews.models import User
+
+    return [
+        User.objects.create(
+            username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+        )
+        for idx in range(size)
+    ]
+
+
+def create_reviews_with_comments(size):
+    """Отзывы size авторов и комментарии каждого к первому отзыву."""
+    from reviews.models import Comment, Review, Title
+
+    title = Title.objects.create(name='Терминатор', year=1984)
+    authors = create_authors(size)
+    reviews = [
+        Review.objects.create(
+            title=title, author=author, text=f'Отзыв {idx}', score=5
+        )
+        for idx, author in enumerate(authors)
+    ]
+    for idx, author in enumerate(authors):
+        Comment.objects.create(
+            review=reviews[0], author=author, text=f'Комментарий {idx}'
+        )
+    return title, reviews[0]
+
+
+def create_commented_reviews(size):
+    """Отзывы size авторов; к i-му отзыву комментируют i + 1 авторов."""
+    from reviews.models import Comment, Review, Title
+
+    title = Title.objects.create(name='Терминатор', year=1984)
+    authors = create_authors(size)
+    comments = {}
+    for idx, author in enumerate(authors):
+        review = Review.objects.create(
+            title=title, author=author, text='Отзыв', score=5
+        )
+        comments[review.id] = [
+            Comment.objects.create(
+                review=review, author=commenter, text=f'Комментарий {num}'
+            ).id
+            for num, commenter in enumerate(authors[:idx + 1])
+        ]
+    return title, comments